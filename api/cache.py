@@ -0,0 +1,161 @@
+import threading
+import time
+from collections import namedtuple
+from utils import metrics
+
+# ttl: seconds an entry is served as fresh
+# stale: extra seconds an expired entry may still be served while it is
+#        refreshed in the background (None = serve stale indefinitely)
+CachePolicy = namedtuple('CachePolicy', ['ttl', 'stale'])
+
+# value: the cached payload
+# fetched_at: wall-clock time the payload was fetched from upstream
+# offline: True when the upstream failed and this is the last good snapshot
+CacheEntry = namedtuple('CacheEntry', ['value', 'fetched_at', 'offline'])
+
+
+class TTLCache:
+    """Thread-safe in-process cache with per-entry TTL and stale-while-revalidate.
+
+    When a persistent store is given, misses read through it before calling
+    upstream and every successful fetch is written back, so a restarted
+    process starts warm and can fall back to the last good snapshot.
+    """
+
+    def __init__(self, store=None):
+        self.store = store
+        self._entries = {}
+        self._refreshing = set()
+        self._lock = threading.Lock()
+
+    def get(self, key, policy, fetch):
+        """Return the cached value for key, calling fetch() when it is missing or too old"""
+        return self.lookup(key, policy, fetch).value
+
+    def lookup(self, key, policy, fetch):
+        """Return a CacheEntry for key, calling fetch() when it is missing or too old.
+
+        A fresh entry is returned as is. An expired entry that is still inside
+        the stale window is returned immediately and refreshed on a background
+        thread. Anything older is fetched synchronously; if that fetch raises
+        and an older snapshot exists, the snapshot is returned flagged offline.
+        Failed fetches are never cached.
+        """
+        entry = self._read(key)
+
+        if entry is not None:
+            value, fetched_at = entry
+            age = time.time() - fetched_at
+            if policy.ttl is None or age < policy.ttl:
+                _count(key, 'hit')
+                return CacheEntry(value, fetched_at, False)
+            if policy.stale is None or age < policy.ttl + policy.stale:
+                _count(key, 'stale')
+                self._refresh_in_background(key, fetch)
+                return CacheEntry(value, fetched_at, False)
+
+        try:
+            value = fetch()
+        except Exception:
+            if entry is None:
+                _count(key, 'error')
+                raise
+            _count(key, 'offline')
+            return CacheEntry(entry[0], entry[1], True)
+        _count(key, 'miss')
+        fetched_at = self.set(key, value)
+        return CacheEntry(value, fetched_at, False)
+
+    def peek(self, key, policy):
+        """Return the CacheEntry for key if policy still allows serving it, else None.
+
+        Unlike lookup() this never fetches. An entry in its stale window is
+        returned as is; replacing it is up to the caller (see
+        refresh_in_background()).
+        """
+        entry = self._read(key)
+        if entry is None:
+            _count(key, 'miss')
+            return None
+        value, fetched_at = entry
+        age = time.time() - fetched_at
+        if policy.ttl is None or age < policy.ttl:
+            _count(key, 'hit')
+            return CacheEntry(value, fetched_at, False)
+        if policy.stale is None or age < policy.ttl + policy.stale:
+            _count(key, 'stale')
+            return CacheEntry(value, fetched_at, False)
+        _count(key, 'miss')
+        return None
+
+    def set(self, key, value):
+        """Store value under key, stamped with the current time, and return the stamp"""
+        fetched_at = time.time()
+        with self._lock:
+            previous = self._entries.get(key)
+            self._entries[key] = (value, fetched_at)
+        # A revalidated (304) payload comes back as the very same object; the
+        # snapshot on disk already holds it
+        unchanged = previous is not None and previous[0] is value
+        if self.store is not None and not unchanged:
+            self.store.put(key, value, fetched_at)
+        return fetched_at
+
+    def fetched_at(self, key):
+        """Return when the value stored for key was fetched, or None; not counted as a lookup"""
+        entry = self._read(key)
+        return entry[1] if entry is not None else None
+
+    def invalidate(self, key=None):
+        """Drop one in-memory entry, or every entry when key is None"""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def _read(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None and self.store is not None:
+            entry = self.store.get(key)
+            if entry is not None:
+                with self._lock:
+                    entry = self._entries.setdefault(key, entry)
+        return entry
+
+    def refresh_in_background(self, key, refresh):
+        """Run refresh() on a background thread unless one started under key is still running.
+
+        refresh() stores what it fetches itself (see set()). Failures are
+        ignored: stale entries keep being served and the next expired read
+        retries.
+        """
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def run():
+            try:
+                refresh()
+            except Exception:
+                pass
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=run, name=f"cache-refresh-{key[0]}", daemon=True).start()
+
+    def _refresh_in_background(self, key, fetch):
+        self.refresh_in_background(key, lambda: self.set(key, fetch()))
+
+
+def _count(key, result):
+    metrics.increment('spaceapi_cache_requests_total', endpoint=key[0], result=result)
+
+
+def make_key(endpoint, params=None):
+    """Build a hashable cache key from an endpoint name and its request parameters"""
+    params = {k: v for k, v in (params or {}).items() if k != 'api_key'}
+    return (endpoint, tuple(sorted(params.items())))
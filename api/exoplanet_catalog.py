@@ -0,0 +1,182 @@
+import csv
+import sqlite3
+import threading
+import time
+import pandas as pd
+import requests
+from api.store import DATA_DIR
+from utils.exoplanet_metrics import add_derived_metrics
+from utils import metrics
+
+DEFAULT_PATH = DATA_DIR / 'exoplanets.sqlite3'
+
+# Rows per TAP request; pages are keyed on pl_name so they stay stable while
+# the archive is being updated
+PAGE_SIZE = 2000
+
+# Planetary Systems columns we ingest: name -> (SQLite type, in-memory dtype)
+COLUMNS = {
+    'pl_name': ('text', 'string'),
+    'hostname': ('text', 'category'),
+    'discoverymethod': ('text', 'category'),
+    'disc_year': ('integer', 'Int16'),
+    'pl_orbper': ('real', 'float32'),
+    'pl_orbsmax': ('real', 'float32'),
+    'pl_rade': ('real', 'float32'),
+    'pl_masse': ('real', 'float32'),
+    'pl_orbeccen': ('real', 'float32'),
+    'pl_eqt': ('real', 'float32'),
+    'pl_insol': ('real', 'float32'),
+    'st_spectype': ('text', 'category'),
+    'st_teff': ('real', 'float32'),
+    'st_rad': ('real', 'float32'),
+    'st_mass': ('real', 'float32'),
+    'st_lum': ('real', 'float32'),
+    'sy_dist': ('real', 'float32'),
+    'rowupdate': ('text', 'datetime64[ns]'),
+}
+
+_CONVERTERS = {'text': str, 'integer': int, 'real': float}
+
+
+class ExoplanetCatalog:
+    """Local copy of the Planetary Systems (ps) catalog, one default row per planet.
+
+    The catalog is downloaded from the TAP service in pages of CSV that are
+    parsed line by line and written straight into a typed SQLite table, so the
+    full response is never held in memory. Later refreshes only request rows
+    whose rowupdate is no older than the newest row stored by the last refresh
+    that completed; an interrupted refresh leaves that watermark alone, so the
+    next one asks again for every row it missed.
+    """
+
+    def __init__(self, session, api_url, path=DEFAULT_PATH):
+        self.session = session
+        self.api_url = api_url
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = None
+        self._frame = None
+        self._frame_version = None
+
+    def _connect(self):
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            conn.execute("pragma journal_mode=wal")
+            columns = ", ".join(f"{name} {sql_type}" for name, (sql_type, _) in COLUMNS.items())
+            conn.execute(f"create table if not exists planets ({columns}, primary key (pl_name))")
+            conn.execute("create table if not exists sync_state (name text primary key, value text)")
+            self._conn = conn
+        return self._conn
+
+    def version(self):
+        """Return (newest rowupdate, row count) of the stored catalog"""
+        with self._lock:
+            return tuple(self._connect().execute("select max(rowupdate), count(*) from planets").fetchone())
+
+    def refresh(self):
+        """Download rows that are new or updated since the last completed refresh and return the new version"""
+        with self._lock:
+            row = self._connect().execute("select value from sync_state where name = 'since'").fetchone()
+        since = row[0] if row else None
+        last_name = ''
+        while True:
+            rows = self._fetch_page(last_name, since)
+            if rows:
+                with self._lock:
+                    conn = self._connect()
+                    placeholders = ", ".join("?" for _ in COLUMNS)
+                    conn.executemany(f"insert or replace into planets values ({placeholders})", rows)
+                    conn.commit()
+            if len(rows) < PAGE_SIZE:
+                break
+            last_name = rows[-1][0]
+        # Pages are committed as they arrive, so only now is every row updated
+        # since the old watermark stored
+        with self._lock:
+            conn = self._connect()
+            conn.execute("insert or replace into sync_state values ('since', (select max(rowupdate) from planets))")
+            conn.commit()
+        return self.version()
+
+    def frame(self):
+        """Return the stored catalog as a DataFrame with compact dtypes, newest discoveries first.
+
+        Derived metrics (habitable zone, equilibrium temperature, ESI) are
+        computed here, so they run once per catalog version rather than on
+        every rerun.
+        """
+        version = self.version()
+        with self._lock:
+            if self._frame is None or self._frame_version != version:
+                df = pd.read_sql_query(
+                    "select * from planets order by disc_year desc, pl_name",
+                    self._connect()
+                )
+                df = df.astype({name: dtype for name, (_, dtype) in COLUMNS.items()})
+                self._frame = add_derived_metrics(df)
+                self._frame_version = version
+            return self._frame
+
+    def _fetch_page(self, after_name, since=None):
+        where = ["default_flag = 1", f"pl_name > '{_quote(after_name)}'"]
+        if since:
+            # Inclusive so rows updated later on the same day are not missed
+            where.append(f"rowupdate >= '{_quote(since)}'")
+        query = (
+            f"select top {PAGE_SIZE} {', '.join(COLUMNS)} from ps "
+            f"where {' and '.join(where)} order by pl_name"
+        )
+        return self.fetch_rows(query)[1]
+
+    def fetch_rows(self, query):
+        """Run an ADQL query against the TAP service and return (columns, rows).
+
+        Columns are the catalog columns the query selected, in COLUMNS order;
+        rows are tuples of converted values in that order. The CSV response is
+        parsed as it streams in.
+        """
+        started = time.perf_counter()
+        try:
+            response = self.session.get(
+                self.api_url,
+                params={'query': query, 'format': 'csv'},
+                stream=True
+            )
+        except requests.RequestException:
+            metrics.increment('spaceapi_requests_total', endpoint='exoplanets', status='error')
+            raise
+        metrics.increment('spaceapi_requests_total', endpoint='exoplanets', status=str(response.status_code))
+        response.raise_for_status()
+        response.encoding = response.encoding or 'utf-8'
+        received = [0]
+
+        def lines():
+            # Count payload bytes as the stream is consumed
+            for line in response.iter_lines(decode_unicode=True):
+                received[0] += len(line) + 1
+                yield line
+
+        try:
+            reader = csv.reader(lines())
+            header = next(reader, None)
+            if header is None:
+                return [], []
+            converters = [_CONVERTERS[COLUMNS[name][0]] for name in header]
+            columns = [name for name in COLUMNS if name in header]
+            order = [header.index(name) for name in columns]
+            return columns, [_convert_row(values, converters, order) for values in reader if values]
+        finally:
+            response.close()
+            metrics.observe('spaceapi_request_seconds', time.perf_counter() - started, endpoint='exoplanets')
+            metrics.observe('spaceapi_response_bytes', received[0], metrics.BYTES_BUCKETS, endpoint='exoplanets')
+
+
+def _convert_row(values, converters, order):
+    converted = [convert(value) if value != '' else None for convert, value in zip(converters, values)]
+    return tuple(converted[i] for i in order)
+
+
+def _quote(value):
+    return str(value).replace("'", "''")
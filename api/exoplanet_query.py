@@ -0,0 +1,256 @@
+import threading
+from collections import OrderedDict, namedtuple
+import pandas as pd
+from api.exoplanet_catalog import COLUMNS
+from utils.exoplanet_metrics import add_derived_metrics
+from utils import metrics
+
+# Computed locally by utils.exoplanet_metrics, from these catalog columns;
+# filters and ordering on them can't be sent to the TAP service
+DERIVED_COLUMNS = ('hz_inner', 'hz_outer', 'in_hz', 'eq_temp', 'esi')
+DERIVED_INPUTS = ('pl_orbsmax', 'pl_rade', 'pl_eqt', 'pl_insol', 'st_teff', 'st_rad', 'st_lum')
+
+OPERATORS = ('>=', '<=', '=', 'in')
+
+# column: catalog or derived column name
+# op: one of OPERATORS
+# value: a number or string; a tuple of them for 'in'
+Filter = namedtuple('Filter', ['column', 'op', 'value'])
+
+# filters: tuple of Filters, at most one per (column, op), sorted
+# columns: sorted tuple of projected columns (pl_name always included), None for all
+# order_by / descending: sort column and direction; ties are broken by pl_name
+# limit: maximum number of rows, None for all
+ExoplanetQuery = namedtuple('ExoplanetQuery', ['filters', 'columns', 'order_by', 'descending', 'limit'])
+
+QUERY_CACHE_ENTRIES = 32
+
+
+def make_query(filters=(), columns=None, order_by='disc_year', descending=True, limit=None):
+    """Build a normalized ExoplanetQuery, so equivalent queries compare (and cache) equal.
+
+    Repeated bounds on a column collapse to the tightest one, '=' becomes a
+    one-value 'in' and 'in' sets intersect. Unknown columns or operators
+    raise ValueError.
+    """
+    known = set(COLUMNS) | set(DERIVED_COLUMNS)
+    lower, upper, allowed = {}, {}, {}
+    for column, op, value in filters:
+        if column not in known:
+            raise ValueError(f"Unknown exoplanet column: {column}")
+        if op == '>=':
+            lower[column] = max(value, lower.get(column, value))
+        elif op == '<=':
+            upper[column] = min(value, upper.get(column, value))
+        elif op in ('=', 'in'):
+            values = {value} if op == '=' else set(value)
+            allowed[column] = allowed[column] & values if column in allowed else values
+        else:
+            raise ValueError(f"Unsupported operator: {op}")
+
+    normalized = (
+        [Filter(column, '>=', value) for column, value in lower.items()] +
+        [Filter(column, '<=', value) for column, value in upper.items()] +
+        [Filter(column, 'in', tuple(sorted(values, key=str))) for column, values in allowed.items()]
+    )
+    if columns is not None:
+        unknown = set(columns) - known
+        if unknown:
+            raise ValueError(f"Unknown exoplanet columns: {', '.join(sorted(unknown))}")
+        columns = tuple(sorted(set(columns) | {'pl_name'}))
+    if order_by not in known:
+        raise ValueError(f"Unknown exoplanet column: {order_by}")
+    return ExoplanetQuery(tuple(sorted(normalized)), columns, order_by, bool(descending), limit)
+
+
+def needed_columns(query):
+    """Columns a result must have to evaluate query on it: projection, filters and order"""
+    if query.columns is None:
+        return None
+    return set(query.columns) | {f.column for f in query.filters} | {query.order_by, 'pl_name'}
+
+
+def pushdown(query):
+    """The part of query the TAP service can run: the ExoplanetQuery to send upstream.
+
+    Filters and ordering on derived columns stay local, in which case the
+    derived metrics' inputs are fetched instead and the limit can't be
+    applied upstream either.
+    """
+    local = {f.column for f in query.filters if f.column in DERIVED_COLUMNS}
+    if query.order_by in DERIVED_COLUMNS:
+        local.add(query.order_by)
+
+    needed = needed_columns(query)
+    if needed is None:
+        columns = None
+    else:
+        if needed & set(DERIVED_COLUMNS):
+            needed |= set(DERIVED_INPUTS)
+        columns = tuple(sorted(needed - set(DERIVED_COLUMNS)))
+
+    return ExoplanetQuery(
+        tuple(f for f in query.filters if f.column not in DERIVED_COLUMNS),
+        columns,
+        query.order_by if not local else 'disc_year',
+        query.descending if not local else True,
+        query.limit if not local else None
+    )
+
+
+def to_adql(query, table='ps'):
+    """Compile a pushed-down query (see pushdown) to ADQL for the TAP service"""
+    columns = [name for name in COLUMNS if query.columns is None or name in query.columns]
+    where = ["default_flag = 1"]
+    for column, op, value in query.filters:
+        if op == 'in':
+            where.append(f"{column} in ({', '.join(_literal(v) for v in value)})")
+        else:
+            where.append(f"{column} {op} {_literal(value)}")
+    top = f"top {int(query.limit)} " if query.limit is not None else ""
+    direction = "desc" if query.descending else "asc"
+    return (
+        f"select {top}{', '.join(columns)} from {table} "
+        f"where {' and '.join(where)} order by {query.order_by} {direction}, pl_name"
+    )
+
+
+def _literal(value):
+    if isinstance(value, str):
+        return "'" + value.replace("'", "''") + "'"
+    return repr(float(value)) if isinstance(value, float) else str(int(value))
+
+
+def _implied(wider, narrower_filters):
+    """True when every row passing narrower_filters also passes the wider filter"""
+    for column, op, value in narrower_filters:
+        if column != wider.column:
+            continue
+        if op == wider.op == '>=' and value >= wider.value:
+            return True
+        if op == wider.op == '<=' and value <= wider.value:
+            return True
+        if op == 'in':
+            if wider.op == 'in' and set(value) <= set(wider.value):
+                return True
+            if wider.op == '>=' and all(v >= wider.value for v in value):
+                return True
+            if wider.op == '<=' and all(v <= wider.value for v in value):
+                return True
+    return False
+
+
+def covers(wider, complete, narrower, available=None):
+    """True when evaluating narrower on wider's result gives narrower's full answer.
+
+    complete says wider's result wasn't cut short by its limit; available is
+    the set of columns the result actually has (None: every column).
+    """
+    needed = needed_columns(narrower)
+    if available is not None and (needed is None or not needed <= available):
+        return False
+    if not all(_implied(f, narrower.filters) for f in wider.filters):
+        return False
+    if complete:
+        return True
+    # A truncated result only answers the same query with a smaller limit
+    return (
+        wider.filters == narrower.filters and
+        (wider.order_by, wider.descending) == (narrower.order_by, narrower.descending) and
+        narrower.limit is not None and narrower.limit <= wider.limit
+    )
+
+
+def frame_from_rows(columns, rows):
+    """Typed DataFrame for (columns, rows) from ExoplanetCatalog.fetch_rows, with derived metrics when possible"""
+    df = pd.DataFrame.from_records(rows, columns=columns)
+    df = df.astype({name: COLUMNS[name][1] for name in columns})
+    if set(DERIVED_INPUTS) <= set(columns):
+        df = add_derived_metrics(df)
+    return df
+
+
+def evaluate(query, df):
+    """Apply query's filters, order, limit and projection to a DataFrame that has the needed columns"""
+    mask = None
+    for column, op, value in query.filters:
+        series = df[column]
+        if op == '>=':
+            condition = series >= value
+        elif op == '<=':
+            condition = series <= value
+        else:
+            condition = series.isin(value)
+        condition = condition.fillna(False).astype(bool)
+        mask = condition if mask is None else mask & condition
+    result = df[mask] if mask is not None else df
+    result = result.sort_values(
+        [query.order_by, 'pl_name'],
+        ascending=[not query.descending, True],
+        na_position='last',
+        kind='stable'
+    )
+    if query.limit is not None:
+        result = result.head(query.limit)
+    if query.columns is not None:
+        result = result[[c for c in result.columns if c in query.columns]]
+    return result.reset_index(drop=True)
+
+
+class QueryCache:
+    """Recent query results for one version of the data.
+
+    An exact repeat of a query is a hit; a query that a cached wider result
+    covers (see covers) is evaluated on the smallest such result instead of
+    the whole catalog. Everything is dropped when the data version changes.
+    """
+
+    def __init__(self, max_entries=QUERY_CACHE_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._version = None
+        self._lock = threading.Lock()
+
+    def find(self, query, version):
+        """Return (frame, exact) for the best cached answer to query, or (None, False)"""
+        with self._lock:
+            if version != self._version:
+                self._entries.clear()
+                self._version = version
+            if query in self._entries:
+                self._entries.move_to_end(query)
+                metrics.increment('spaceapi_cache_requests_total', endpoint='exoplanet_query', result='hit')
+                return self._entries[query][0], True
+            candidates = [
+                (len(frame), wider) for wider, (frame, complete, available) in self._entries.items()
+                if covers(wider, complete, query, available)
+            ]
+            if not candidates:
+                metrics.increment('spaceapi_cache_requests_total', endpoint='exoplanet_query', result='miss')
+                return None, False
+            wider = min(candidates, key=lambda candidate: candidate[0])[1]
+            self._entries.move_to_end(wider)
+            metrics.increment('spaceapi_cache_requests_total', endpoint='exoplanet_query', result='subsumed')
+            return self._entries[wider][0], False
+
+    def put(self, query, version, frame):
+        with self._lock:
+            if version != self._version:
+                return
+            complete = query.limit is None or len(frame) < query.limit
+            # Derived metrics are in a result only when they were computed or
+            # kept, so go by the frame rather than the query
+            available = set(frame.columns) if query.columns is not None else None
+            self._entries[query] = (frame, complete, available)
+            self._entries.move_to_end(query)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def answer(self, query, version, load_source):
+        """Return query's result, from the cache when possible, else evaluated on load_source()"""
+        cached, exact = self.find(query, version)
+        if exact:
+            return cached
+        result = evaluate(query, cached if cached is not None else load_source())
+        self.put(query, version, result)
+        return result
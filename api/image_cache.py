@@ -0,0 +1,136 @@
+import hashlib
+import io
+import os
+import threading
+import time
+from pathlib import Path
+import requests
+from api.singleflight import SingleFlight
+from api.store import DATA_DIR
+from utils import metrics
+
+DEFAULT_DIR = DATA_DIR / 'images'
+MAX_BYTES = 256 * 1024 * 1024
+
+# Longest edge in pixels per variant; every download produces all of them
+VARIANTS = {
+    'thumb': 320,
+    'medium': 1280,
+}
+JPEG_QUALITY = 82
+# Originals larger than this are refused rather than decoded
+MAX_SOURCE_BYTES = 32 * 1024 * 1024
+
+
+class ImageCache:
+    """On-disk cache of resized upstream images with least-recently-used eviction.
+
+    The first request for a URL downloads the original once, writes every
+    variant in VARIANTS as a JPEG and discards the original, so browsers are
+    served small local files instead of full-resolution upstream images.
+    Reads refresh a file's mtime, and when the directory grows past
+    max_bytes the least recently used files are deleted.
+    """
+
+    def __init__(self, session, directory=DEFAULT_DIR, max_bytes=MAX_BYTES):
+        self.session = session
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._in_flight = SingleFlight()
+        self._sizes = None
+
+    def get(self, url, variant='thumb'):
+        """Return the local path of url resized to variant, downloading it on first use"""
+        path = self._path(url, variant)
+        if path.exists():
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+            metrics.increment('spaceapi_cache_requests_total', endpoint='image', result='hit')
+            return path
+        try:
+            self._in_flight.do(('image', url), lambda: self._fetch(url))
+        except Exception:
+            metrics.increment('spaceapi_cache_requests_total', endpoint='image', result='error')
+            raise
+        metrics.increment('spaceapi_cache_requests_total', endpoint='image', result='miss')
+        return path
+
+    def _path(self, url, variant):
+        digest = hashlib.sha1(url.encode('utf-8')).hexdigest()
+        return self.directory / f"{digest}-{variant}.jpg"
+
+    def _fetch(self, url):
+        from PIL import Image, ImageOps
+
+        started = time.perf_counter()
+        try:
+            response = self.session.get(url, headers={'Accept': 'image/*'}, stream=True)
+            response.raise_for_status()
+            content = io.BytesIO()
+            for chunk in response.iter_content(64 * 1024):
+                content.write(chunk)
+                if content.tell() > MAX_SOURCE_BYTES:
+                    raise ValueError(f"Image larger than {MAX_SOURCE_BYTES} bytes: {url}")
+        except requests.RequestException:
+            metrics.increment('spaceapi_requests_total', endpoint='image', status='error')
+            raise
+        metrics.observe('spaceapi_request_seconds', time.perf_counter() - started, endpoint='image')
+        metrics.observe('spaceapi_response_bytes', content.tell(), metrics.BYTES_BUCKETS, endpoint='image')
+        metrics.increment('spaceapi_requests_total', endpoint='image', status=str(response.status_code))
+
+        content.seek(0)
+        with Image.open(content) as original:
+            # Let the JPEG decoder downscale while decoding when it can
+            original.draft('RGB', (VARIANTS['medium'], VARIANTS['medium']))
+            image = ImageOps.exif_transpose(original).convert('RGB')
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        # Largest first, each variant resized from the previous one
+        for variant, edge in sorted(VARIANTS.items(), key=lambda item: -item[1]):
+            image.thumbnail((edge, edge), Image.Resampling.LANCZOS)
+            path = self._path(url, variant)
+            partial = path.with_suffix('.part')
+            image.save(partial, 'JPEG', quality=JPEG_QUALITY, optimize=True, progressive=True)
+            os.replace(partial, path)
+            self._added(path)
+        self._evict()
+
+    def _scan(self):
+        # Called with the lock held
+        if self._sizes is None:
+            self._sizes = {}
+            if self.directory.exists():
+                for path in self.directory.glob('*.jpg'):
+                    try:
+                        self._sizes[path] = path.stat().st_size
+                    except OSError:
+                        pass
+        return self._sizes
+
+    def _added(self, path):
+        with self._lock:
+            self._scan()[path] = path.stat().st_size
+
+    def _evict(self):
+        with self._lock:
+            sizes = self._scan()
+            total = sum(sizes.values())
+            if total <= self.max_bytes:
+                return
+            by_use = []
+            for path in sizes:
+                try:
+                    by_use.append((path.stat().st_mtime, path))
+                except OSError:
+                    by_use.append((0, path))
+            for _, path in sorted(by_use):
+                if total <= self.max_bytes:
+                    break
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+                total -= sizes.pop(path)
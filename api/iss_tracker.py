@@ -0,0 +1,88 @@
+import threading
+import time
+import numpy as np
+
+SAMPLE_INTERVAL = 5                 # seconds between upstream polls
+HISTORY_SECONDS = 2 * 60 * 60       # a little over one orbit
+CAPACITY = HISTORY_SECONDS // SAMPLE_INTERVAL
+
+
+class ISSTracker:
+    """Process-wide background sampler of the ISS position.
+
+    A single daemon thread polls fetch() every interval seconds and writes
+    (latitude, longitude, timestamp) into fixed-size ring buffers, so every
+    session reads the same in-memory history instead of calling upstream.
+    fetch() must return a dict with 'latitude', 'longitude' and 'timestamp'.
+    """
+
+    def __init__(self, fetch, interval=SAMPLE_INTERVAL, capacity=CAPACITY):
+        self.fetch = fetch
+        self.interval = interval
+        self.capacity = capacity
+        self._lat = np.empty(capacity, dtype='float64')
+        self._lon = np.empty(capacity, dtype='float64')
+        self._ts = np.empty(capacity, dtype='int64')
+        self._head = 0      # next slot to write
+        self._size = 0
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def start(self):
+        """Start the polling thread once; later calls are no-ops"""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name='iss-tracker', daemon=True)
+            self._thread.start()
+
+    def record(self, location):
+        """Append one sample, ignoring repeats of the newest timestamp"""
+        with self._lock:
+            if self._size and self._ts[(self._head - 1) % self.capacity] >= location['timestamp']:
+                return
+            self._lat[self._head] = location['latitude']
+            self._lon[self._head] = location['longitude']
+            self._ts[self._head] = location['timestamp']
+            self._head = (self._head + 1) % self.capacity
+            self._size = min(self._size + 1, self.capacity)
+
+    def latest(self):
+        """Return the newest sample as a location dict, or None before the first sample"""
+        with self._lock:
+            if not self._size:
+                return None
+            i = (self._head - 1) % self.capacity
+            return {
+                'latitude': float(self._lat[i]),
+                'longitude': float(self._lon[i]),
+                'timestamp': int(self._ts[i])
+            }
+
+    def track(self, seconds):
+        """Return (latitudes, longitudes, timestamps) copies for the last seconds, oldest first"""
+        with self._lock:
+            order = (np.arange(self._size) + self._head - self._size) % self.capacity
+            lat, lon, ts = self._lat[order], self._lon[order], self._ts[order]
+        if not len(ts):
+            return lat, lon, ts
+        keep = ts >= ts[-1] - seconds
+        return lat[keep], lon[keep], ts[keep]
+
+    def _run(self):
+        while True:
+            started = time.monotonic()
+            try:
+                self.record(self.fetch())
+            except Exception:
+                # Transient upstream failure; the next tick tries again
+                pass
+            time.sleep(max(0.0, self.interval - (time.monotonic() - started)))
+
+
+def split_at_antimeridian(lat, lon):
+    """Insert NaN breaks where the track wraps past ±180° so map lines don't cross the globe"""
+    if len(lon) < 2:
+        return lat, lon
+    breaks = np.flatnonzero(np.abs(np.diff(lon)) > 180) + 1
+    return np.insert(lat, breaks, np.nan), np.insert(lon, breaks, np.nan)
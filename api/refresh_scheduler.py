@@ -0,0 +1,87 @@
+import threading
+import time
+from api.cache import CachePolicy
+
+# Upstreams reset their quota on a rolling hour; an observation older than
+# this says nothing about the current budget
+QUOTA_WINDOW = 60 * 60
+
+# (remaining fraction at or below, refresh interval multiplier) per priority.
+# Low-priority data gives way first so high-priority data keeps its TTLs.
+STRETCH = {
+    'low': ((0.5, 2), (0.25, 6), (0.1, 24)),
+    'normal': ((0.25, 2), (0.1, 6)),
+    'high': ((0.05, 2),),
+}
+
+
+class RefreshScheduler:
+    """Stretches refresh intervals as upstream rate-limit quotas run down.
+
+    Quotas are tracked per API key (or host, for keyless APIs) from the
+    X-RateLimit-Limit / X-RateLimit-Remaining headers of each response. Each
+    endpoint draws from the quota it was last seen using, and its cache
+    policy is scaled by the multiplier for its priority at that quota's
+    remaining fraction.
+    """
+
+    def __init__(self, policies, priorities):
+        self.policies = policies
+        self.priorities = priorities
+        self._quotas = {}
+        self._endpoint_quota = {}
+        self._lock = threading.Lock()
+
+    def record(self, endpoint, quota, headers):
+        """Note the rate-limit headers of a response to endpoint drawn from quota"""
+        remaining = headers.get('X-RateLimit-Remaining')
+        limit = headers.get('X-RateLimit-Limit')
+        if remaining is None or limit is None:
+            return
+        try:
+            remaining, limit = int(remaining), int(limit)
+        except ValueError:
+            return
+        with self._lock:
+            self._quotas[quota] = (limit, remaining, time.time())
+            self._endpoint_quota[endpoint] = quota
+
+    def remaining(self, quota):
+        """Fraction of quota left, or None when unknown or the window has passed"""
+        with self._lock:
+            observed = self._quotas.get(quota)
+        if observed is None:
+            return None
+        limit, remaining, observed_at = observed
+        if limit <= 0 or time.time() - observed_at > QUOTA_WINDOW:
+            return None
+        return remaining / limit
+
+    def stretch(self, endpoint):
+        """Multiplier applied to endpoint's refresh intervals right now"""
+        with self._lock:
+            quota = self._endpoint_quota.get(endpoint)
+        fraction = self.remaining(quota) if quota is not None else None
+        if fraction is None:
+            return 1
+        factor = 1
+        for threshold, multiplier in STRETCH[self.priorities.get(endpoint, 'normal')]:
+            if fraction <= threshold:
+                factor = multiplier
+        return factor
+
+    def policy(self, endpoint):
+        """The endpoint's CachePolicy, stretched for the current quota"""
+        policy = self.policies[endpoint]
+        factor = self.stretch(endpoint)
+        if factor == 1:
+            return policy
+        return CachePolicy(
+            ttl=policy.ttl * factor if policy.ttl is not None else None,
+            stale=policy.stale * factor if policy.stale is not None else None
+        )
+
+    def quotas(self):
+        """Return [(quota, limit, remaining, observed_at)] for reporting"""
+        with self._lock:
+            return [(quota, *observed) for quota, observed in sorted(self._quotas.items())]
@@ -0,0 +1,110 @@
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from utils import metrics
+
+# (connect, read) timeouts in seconds applied to every request without an explicit one
+DEFAULT_TIMEOUT = (3.05, 15)
+
+# Connection pools are kept per host; a handful of hosts, several threads each
+POOL_CONNECTIONS = 8
+POOL_MAXSIZE = 16
+
+MAX_RETRIES = 3
+BACKOFF_FACTOR = 0.3
+# Random extra seconds per backoff so retries from many threads don't align;
+# every backoff, jitter included, is clamped to BACKOFF_MAX
+BACKOFF_JITTER = 0.5
+BACKOFF_MAX = 2
+# Longest Retry-After honoured; retries run on the page's script thread
+MAX_RETRY_AFTER = 1
+# 429 is not retried: a spent quota doesn't recover within a retry budget, and
+# failing fast lets the cache serve its snapshot (see api.refresh_scheduler)
+RETRY_STATUSES = (500, 502, 503, 504)
+
+_session = None
+_session_lock = threading.Lock()
+
+
+class BoundedRetry(Retry):
+    """Retry that counts the retries it grants and caps how long Retry-After can stall one"""
+
+    def increment(self, method=None, url=None, response=None, error=None, _pool=None, _stacktrace=None):
+        # Raises once the budget is spent; only a granted retry is counted
+        retry = super().increment(method, url, response, error, _pool, _stacktrace)
+        metrics.increment('spaceapi_retries_total', host=_pool.host if _pool is not None else 'unknown')
+        return retry
+
+    def is_retry(self, method, status_code, has_retry_after=False):
+        # urllib3 retries any 413/429/503 carrying Retry-After, listed or not
+        if status_code not in (self.status_forcelist or ()):
+            return False
+        return super().is_retry(method, status_code, has_retry_after)
+
+    def get_retry_after(self, response):
+        retry_after = super().get_retry_after(response)
+        return min(retry_after, MAX_RETRY_AFTER) if retry_after is not None else None
+
+
+class TimeoutHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter that applies DEFAULT_TIMEOUT when the caller passes none"""
+
+    def send(self, request, **kwargs):
+        if kwargs.get('timeout') is None:
+            kwargs['timeout'] = DEFAULT_TIMEOUT
+        return super().send(request, **kwargs)
+
+
+def _build_adapter(methods=('GET', 'HEAD')):
+    retry = BoundedRetry(
+        total=MAX_RETRIES,
+        connect=MAX_RETRIES,
+        read=MAX_RETRIES,
+        status=MAX_RETRIES,
+        backoff_factor=BACKOFF_FACTOR,
+        backoff_jitter=BACKOFF_JITTER,
+        backoff_max=BACKOFF_MAX,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset(methods),
+        respect_retry_after_header=True,
+        raise_on_status=False
+    )
+    return TimeoutHTTPAdapter(
+        pool_connections=POOL_CONNECTIONS,
+        pool_maxsize=POOL_MAXSIZE,
+        max_retries=retry
+    )
+
+
+def _build_session():
+    adapter = _build_adapter()
+
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers.update({
+        'Accept': 'application/json',
+        'Accept-Encoding': 'gzip, deflate',
+        'Connection': 'keep-alive',
+        'User-Agent': 'PersonalSpaceTracker/1.0'
+    })
+    return session
+
+
+def allow_post_retries(session, url_prefix):
+    """Retry POSTs under url_prefix like GETs, for read-only query endpoints that take a JSON body.
+
+    POST is not retried elsewhere since it isn't idempotent in general.
+    """
+    session.mount(url_prefix, _build_adapter(('GET', 'HEAD', 'POST')))
+
+
+def get_session():
+    """Return the process-wide pooled requests.Session, creating it on first use"""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = _build_session()
+    return _session
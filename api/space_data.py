@@ -1,138 +1,725 @@
+import copy
 import requests
 import os
-from datetime import datetime, timedelta
+import threading
+import time
+import pytz
+from collections import OrderedDict, namedtuple
+from urllib.parse import urlsplit
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, time as dtime, timedelta
 import streamlit as st
+from api.cache import TTLCache, CachePolicy, CacheEntry, make_key
+from api.refresh_scheduler import RefreshScheduler
+from api.session import get_session, POOL_MAXSIZE
+from api.singleflight import SingleFlight
+from api.store import ResponseStore
+from utils.launches import LaunchIndex
+from utils import metrics
+
+# pandas and numpy back the NEO frames, the exoplanet catalog and the ISS
+# sampler. They are imported inside the functions that build those, so pages
+# that don't show them (and the Home page's render) never pay for the import.
+
+# Progress chatter (st.info / st.success) is for local debugging only;
+# errors and offline-snapshot warnings are always shown
+VERBOSE = os.getenv('SPACE_TRACKER_VERBOSE', 'false').lower() == 'true'
+
+# Freshness per endpoint. Expired entries inside the stale window are served
+# immediately while a background refresh fetches the new payload.
+CACHE_POLICIES = {
+    'iss': CachePolicy(ttl=5, stale=10),
+    'launches': CachePolicy(ttl=5 * 60, stale=60 * 60),
+    'apod': CachePolicy(ttl=60 * 60, stale=24 * 60 * 60),
+    'neo': CachePolicy(ttl=10 * 60, stale=60 * 60),
+    'exoplanets': CachePolicy(ttl=6 * 60 * 60, stale=7 * 24 * 60 * 60),
+}
+
+# How readily each endpoint's refreshes are stretched when its upstream
+# rate-limit quota runs low (see api.refresh_scheduler.STRETCH)
+REFRESH_PRIORITIES = {
+    'iss': 'high',
+    'neo': 'high',
+    'launches': 'normal',
+    'apod': 'low',
+    'exoplanets': 'low',
+}
+
+# A completed day of a dated feed (NEO, APOD) never changes
+PAST_DAY_POLICY = CachePolicy(ttl=None, stale=None)
+NEO_FEED_MAX_DAYS = 7
+# APOD serves a whole date range in one request; keep each request modest
+APOD_MAX_RANGE_DAYS = 100
+APOD_GALLERY_DAYS = 30
+
+# loader: SpaceAPI method returning a CacheEntry for the payload, raising on failure
+# label: used in status messages
+# default: returned by get_* when the load fails
+Endpoint = namedtuple('Endpoint', ['loader', 'label', 'default'])
+
+ENDPOINTS = {
+    'launches': Endpoint('_load_upcoming_launches', 'launches', LaunchIndex([])),
+    'apod': Endpoint('_load_astronomy_picture', 'astronomy picture of the day', None),
+    'apod_gallery': Endpoint('_load_apod_gallery', 'astronomy pictures', []),
+    'iss': Endpoint('_load_iss_location', 'ISS location', None),
+    'neo': Endpoint('_load_asteroid_data', 'asteroid data', None),
+    'exoplanets': Endpoint('_load_exoplanets', 'exoplanet data', None),
+    'similar_planets': Endpoint('_load_similar_planets', 'similar planets', None),
+}
+
+# Shared by every SpaceAPI instance, i.e. every rerun and every session. Backed
+# by an on-disk snapshot store so restarts start warm and outages fall back to
+# the last good response.
+_response_cache = TTLCache(
+    store=ResponseStore() if os.getenv('SPACE_TRACKER_DISK_CACHE', 'true').lower() == 'true' else None
+)
+
+# Worker pool for concurrent fan-out and background prefetching; sized to the
+# HTTP connection pool so workers never queue on a free connection
+_executor = ThreadPoolExecutor(max_workers=POOL_MAXSIZE, thread_name_prefix='space-api')
+# Separate pool for nested fetches (NEO and APOD windows, SpaceX ID lookups):
+# loaders running on _executor wait on these, so they must not compete for
+# the same workers
+_window_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='space-api-window')
+_warmed_up = False
+
+# Cache policies scaled by the remaining X-RateLimit quota per API key
+_scheduler = RefreshScheduler(CACHE_POLICIES, REFRESH_PRIORITIES)
+
+# Validators (ETag / Last-Modified) and the parsed body of recent responses,
+# so a conditional request answered with 304 reuses the parsed body as is
+CONDITIONAL_CACHE_SIZE = 64
+_conditional = OrderedDict()
+_conditional_lock = threading.Lock()
+
+# Identical upstream calls made at the same time by different sessions or
+# workers share one request; keyed like the response cache
+_in_flight = SingleFlight()
+
+# ISS positions come from one background sampler shared by all sessions
+_iss_tracker = None
+_iss_tracker_lock = threading.Lock()
+# Six sampler intervals (api.iss_tracker.SAMPLE_INTERVAL)
+ISS_STALE_AFTER = 30
+
+# Normalized frame per NEO feed day, rebuilt only when that day's payload changes
+_neo_frames = {}
+_neo_frames_lock = threading.Lock()
+
+# ((launches payload, SpaceX directory generation), parsed date-sorted view)
+_launch_index = (None, None)
+_launch_index_lock = threading.Lock()
+# Rockets, launchpads and payloads by ID, kept for the life of the process
+_spacex_directory = None
+_spacex_directory_lock = threading.Lock()
+
+_exoplanet_catalog = None
+_exoplanet_catalog_lock = threading.Lock()
+
+# Recent exoplanet query results, per catalog version (see api.exoplanet_query)
+_exoplanet_queries = None
+# Version under which results fetched from the TAP service are cached until
+# the first sync of the local catalog has completed
+UPSTREAM_QUERIES = 'upstream'
+_exoplanet_sync = None
+_exoplanet_sync_lock = threading.Lock()
+
+# (catalog frame, SimilarityIndex built from it)
+_similarity_index = (None, None)
+_similarity_index_lock = threading.Lock()
+
+_image_cache = None
+_image_cache_lock = threading.Lock()
+
 
 class SpaceAPI:
     def __init__(self):
         self.nasa_api_key = os.getenv('NASA_API_KEY')
         if not self.nasa_api_key:
             st.error("NASA API key not found. Please check your .env file.")
-        self.spacex_api_url = "https://api.spacexdata.com/v4"
-        self.nasa_api_url = "https://api.nasa.gov"
-        self.iss_api_url = "http://api.open-notify.org"
+        # Overridable so tests and benchmarks can point at a local replay server
+        self.spacex_api_url = os.getenv('SPACEX_API_URL', "https://api.spacexdata.com/v4")
+        self.nasa_api_url = os.getenv('NASA_API_URL', "https://api.nasa.gov")
+        self.iss_api_url = os.getenv('OPEN_NOTIFY_API_URL', "http://api.open-notify.org")
+        self.exoplanet_api_url = os.getenv('EXOPLANET_API_URL', "https://exoplanetarchive.ipac.caltech.edu/TAP/sync")
+        self.session = get_session()
 
-    def get_upcoming_launches(self):
-        """Fetch upcoming SpaceX launches"""
+    def _get_json(self, url, params=None, endpoint='other', parse=None):
+        """GET url and return the decoded JSON body, or parse(body), raising on HTTP errors.
+
+        Concurrent calls for the same endpoint and parameters are coalesced
+        into one request whose result is shared, so callers must not mutate
+        it. When the previous response carried an ETag or Last-Modified the
+        request is conditional, and a 304 returns the previous result object
+        without decoding or parsing anything.
+        """
+        key = make_key(endpoint, params)
+        return _in_flight.do(key, lambda: self._request_json(url, params, endpoint, key, parse))
+
+    def _request_json(self, url, params, endpoint, key, parse):
+        with _conditional_lock:
+            previous = _conditional.get(key)
+        headers = {}
+        if previous is not None:
+            etag, last_modified, _ = previous
+            if etag:
+                headers['If-None-Match'] = etag
+            if last_modified:
+                headers['If-Modified-Since'] = last_modified
+
+        started = time.perf_counter()
         try:
-            st.info("Fetching upcoming launches...")
-            response = requests.get(f"{self.spacex_api_url}/launches/upcoming")
-            st.write(f"SpaceX API Response Status: {response.status_code}")
-            
-            if response.status_code == 200:
-                launches = response.json()
-                formatted_launches = [{
-                    'name': launch['name'],
-                    'date': launch['date_utc'],
-                    'details': launch.get('details', 'No details available'),
-                    'rocket': launch.get('rocket', 'Unknown rocket'),
-                    'launchpad': launch.get('launchpad', 'Unknown launchpad')
-                } for launch in launches]
-                st.success(f"Successfully fetched {len(formatted_launches)} launches")
-                return formatted_launches
-            else:
-                st.error(f"Failed to fetch launches. Status code: {response.status_code}")
-                return []
+            response = self.session.get(url, params=params, headers=headers)
+        except requests.RequestException:
+            metrics.increment('spaceapi_requests_total', endpoint=endpoint, status='error')
+            raise
+        metrics.observe('spaceapi_request_seconds', time.perf_counter() - started, endpoint=endpoint)
+        metrics.observe('spaceapi_response_bytes', len(response.content), metrics.BYTES_BUCKETS, endpoint=endpoint)
+        metrics.increment('spaceapi_requests_total', endpoint=endpoint, status=str(response.status_code))
+        _scheduler.record(endpoint, _quota_name(url, params), response.headers)
+
+        if response.status_code == 304 and previous is not None:
+            with _conditional_lock:
+                _conditional.move_to_end(key)
+            return previous[2]
+        response.raise_for_status()
+        result = response.json()
+        if parse is not None:
+            result = parse(result)
+
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if etag or last_modified:
+            with _conditional_lock:
+                _conditional[key] = (etag, last_modified, result)
+                _conditional.move_to_end(key)
+                while len(_conditional) > CONDITIONAL_CACHE_SIZE:
+                    _conditional.popitem(last=False)
+        return result
+
+    def _cached(self, endpoint, fetch, params=None):
+        """Look endpoint up in the shared response cache, calling fetch() on a miss"""
+        return _response_cache.lookup(make_key(endpoint, params), _scheduler.policy(endpoint), fetch)
+
+    def _load(self, endpoint, *args):
+        """Run the loader for endpoint, returning (value, error) instead of raising"""
+        try:
+            return getattr(self, ENDPOINTS[endpoint].loader)(*args), None
         except Exception as e:
-            st.error(f"Error fetching launches: {str(e)}")
-            return []
+            return None, e
+
+    def _report(self, endpoint, entry, error):
+        """Surface the outcome of a load on the page and return the value callers expect"""
+        label = ENDPOINTS[endpoint].label
+        if error is None:
+            if entry.offline:
+                saved = datetime.fromtimestamp(entry.fetched_at).strftime('%Y-%m-%d %H:%M')
+                st.warning(f"Upstream unavailable, showing {label} saved at {saved}")
+                return entry.value
+            if VERBOSE:
+                count = f" ({len(entry.value)} records)" if entry.value is not None and not isinstance(entry.value, dict) else ""
+                st.success(f"Successfully fetched {label}{count}")
+            return entry.value
+        if isinstance(error, requests.HTTPError):
+            st.error(f"Failed to fetch {label}. Status code: {error.response.status_code}")
+        else:
+            st.error(f"Error fetching {label}: {str(error)}")
+        return copy.copy(ENDPOINTS[endpoint].default)
+
+    def _get(self, endpoint, *args):
+        if VERBOSE:
+            st.info(f"Fetching {ENDPOINTS[endpoint].label}...")
+        return self._report(endpoint, *self._load(endpoint, *args))
+
+    def fetch_many(self, *calls):
+        """Fetch several endpoints concurrently and return {endpoint: result}.
+
+        Each call is an endpoint name or an (endpoint, *args) tuple, args
+        being what its get_* method takes. All loads are issued at once on
+        the shared worker pool, so the call takes as long as the slowest
+        rather than the sum of them. Results and failures are the same as
+        calling each get_* method.
+        """
+        calls = [(call,) if isinstance(call, str) else tuple(call) for call in calls]
+        if VERBOSE:
+            st.info(f"Fetching {', '.join(ENDPOINTS[endpoint].label for endpoint, *_ in calls)}...")
+        futures = {endpoint: _executor.submit(self._load, endpoint, *args) for endpoint, *args in calls}
+        return {endpoint: self._report(endpoint, *future.result()) for endpoint, future in futures.items()}
+
+    def prefetch(self, *endpoints):
+        """Warm the response cache for endpoints (default: all) in the background without waiting"""
+        return [_executor.submit(self._load, endpoint) for endpoint in endpoints or ENDPOINTS]
+
+    def get_upcoming_launches(self):
+        """Fetch upcoming SpaceX launches as a date-sorted LaunchIndex"""
+        return self._get('launches')
 
     def get_astronomy_picture(self):
         """Fetch NASA's Astronomy Picture of the Day"""
-        try:
-            st.info("Fetching astronomy picture of the day...")
-            params = {'api_key': self.nasa_api_key}
-            response = requests.get(
-                f"{self.nasa_api_url}/planetary/apod",
-                params=params
-            )
-            st.write(f"NASA APOD API Response Status: {response.status_code}")
-            
-            if response.status_code == 200:
-                data = response.json()
-                st.success("Successfully fetched astronomy picture")
-                return data
-            else:
-                st.error(f"Failed to fetch APOD. Status code: {response.status_code}")
+        return self._get('apod')
+
+    def get_apod_gallery(self, start_date=None, end_date=None):
+        """Get Astronomy Pictures of the Day between two dates (inclusive), newest first"""
+        return self._get('apod_gallery', start_date, end_date)
+
+    def get_images(self, urls, variant='thumb'):
+        """Return {url: local path} of urls resized to variant (see api.image_cache), None where it failed.
+
+        Images not yet on disk are downloaded and resized concurrently.
+        """
+        cache = _get_image_cache(self.session)
+
+        def load(url):
+            try:
+                return cache.get(url, variant)
+            except Exception:
                 return None
-        except Exception as e:
-            st.error(f"Error fetching APOD: {str(e)}")
-            return None
+
+        return dict(zip(urls, _executor.map(load, urls)))
 
     def get_iss_location(self):
         """Get current ISS location"""
-        try:
-            st.info("Fetching ISS location...")
-            response = requests.get(f"{self.iss_api_url}/iss-now.json")
-            st.write(f"ISS API Response Status: {response.status_code}")
-            
-            if response.status_code == 200:
-                data = response.json()
-                location = {
-                    'latitude': float(data['iss_position']['latitude']),
-                    'longitude': float(data['iss_position']['longitude']),
-                    'timestamp': data['timestamp']
-                }
-                st.success("Successfully fetched ISS location")
-                return location
-            else:
-                st.error(f"Failed to fetch ISS location. Status code: {response.status_code}")
-                return None
-        except Exception as e:
-            st.error(f"Error fetching ISS location: {str(e)}")
-            return None
+        return self._get('iss')
+
+    def get_iss_track(self, minutes):
+        """Return (latitudes, longitudes, timestamps) of the ISS over the last minutes, oldest first"""
+        return _get_iss_tracker(self._fetch_iss_location).track(minutes * 60)
 
     def get_asteroid_data(self):
-        """Get near-Earth asteroid data"""
-        try:
-            st.info("Fetching asteroid data...")
-            today = datetime.now().strftime('%Y-%m-%d')
-            params = {
-                'api_key': self.nasa_api_key,
-                'start_date': today,
-                'end_date': today
-            }
-            response = requests.get(
-                f"{self.nasa_api_url}/neo/rest/v1/feed",
-                params=params
-            )
-            st.write(f"NASA Asteroid API Response Status: {response.status_code}")
-            
-            if response.status_code == 200:
-                data = response.json()
-                # Extract asteroids for today
-                asteroids = data['near_earth_objects'][today]
-                st.success(f"Successfully fetched {len(asteroids)} asteroids")
-                return asteroids
-            else:
-                st.error(f"Failed to fetch asteroid data. Status code: {response.status_code}")
+        """Get today's near-Earth objects as a normalized DataFrame (see utils.neo)"""
+        return self._get('neo')
+
+    def get_asteroid_feed(self, start_date, end_date):
+        """Get near-Earth objects approaching between two dates (inclusive) as a normalized DataFrame"""
+        return self._get('neo', start_date, end_date)
+
+    def get_exoplanets(self, query=None):
+        """Get exoplanet data from NASA Exoplanet Archive: the whole catalog, or the
+        DataFrame answering an ExoplanetQuery (see api.exoplanet_query.make_query)"""
+        return self._get('exoplanets', query)
+
+    def get_similar_planets(self, name=None, k=10):
+        """Return the k planets most like the named one, or like Earth when name is None,
+        nearest first with a 'distance' column (see utils.exoplanet_similarity).
+
+        Searches the whole catalog; returns None until it has been synced.
+        """
+        return self._get('similar_planets', name, k)
+
+    def _load_upcoming_launches(self):
+        def fetch():
+            return self._get_json(f"{self.spacex_api_url}/launches/upcoming", endpoint='launches', parse=_launch_rows)
+
+        entry = self._cached('launches', fetch)
+        directory = _get_spacex_directory(self.session, self.spacex_api_url)
+        return entry._replace(value=_get_launch_index(entry.value, directory))
+
+    def _load_astronomy_picture(self):
+        params = {'api_key': self.nasa_api_key}
+
+        def fetch():
+            return self._get_json(f"{self.nasa_api_url}/planetary/apod", params=params, endpoint='apod')
+
+        return self._cached('apod', fetch, params)
+
+    def _fetch_iss_location(self):
+        data = self._get_json(f"{self.iss_api_url}/iss-now.json", endpoint='iss')
+        return {
+            'latitude': float(data['iss_position']['latitude']),
+            'longitude': float(data['iss_position']['longitude']),
+            'timestamp': data['timestamp']
+        }
+
+    def _load_iss_location(self):
+        # Read from the shared background sampler; until it has its first
+        # sample, fall back to a direct (cached) request and seed it
+        tracker = _get_iss_tracker(self._fetch_iss_location)
+        location = tracker.latest()
+        if location is None:
+            entry = self._cached('iss', self._fetch_iss_location)
+            tracker.record(entry.value)
+            return entry
+        # A newest sample that stopped advancing means upstream is failing
+        offline = time.time() - location['timestamp'] > ISS_STALE_AFTER
+        return CacheEntry(location, location['timestamp'], offline)
+
+    def _fetch_neo_window(self, start, end):
+        """Fetch one feed window (at most NEO_FEED_MAX_DAYS) and return {day: objects}"""
+        params = {
+            'api_key': self.nasa_api_key,
+            'start_date': start.isoformat(),
+            'end_date': end.isoformat()
+        }
+        data = self._get_json(f"{self.nasa_api_url}/neo/rest/v1/feed", params=params, endpoint='neo')
+        objects_by_day = data['near_earth_objects']
+        return {day: objects_by_day.get(day.isoformat(), []) for day in _days_between(start, end)}
+
+    def _fetch_apod_window(self, start, end):
+        """Fetch one APOD date range and return {day: picture}, None for days without one"""
+        params = {
+            'api_key': self.nasa_api_key,
+            'start_date': start.isoformat(),
+            'end_date': end.isoformat(),
+            # Videos come with a still to use as their thumbnail
+            'thumbs': 'true'
+        }
+        data = self._get_json(f"{self.nasa_api_url}/planetary/apod", params=params, endpoint='apod')
+        pictures = {picture['date']: picture for picture in data}
+        return {day: pictures.get(day.isoformat()) for day in _days_between(start, end)}
+
+    def _peek_day(self, endpoint, day, today, stale=None):
+        """Return the cached CacheEntry for one day of a dated feed if it is still usable, else None.
+
+        A current or future day served past its TTL is appended to stale, for
+        the caller to refresh along with its neighbours.
+        """
+        # Completed past days never change and are kept forever; the current
+        # day (and any future day) follows the endpoint's own policy
+        key = _day_key(endpoint, day)
+        if day < today:
+            entry = _response_cache.peek(key, PAST_DAY_POLICY)
+            # A snapshot taken while the day was still in progress is not final
+            if entry is not None and entry.fetched_at < _end_of_day(day):
                 return None
-        except Exception as e:
-            st.error(f"Error fetching asteroid data: {str(e)}")
-            return None
+            return entry
+        policy = _scheduler.policy(endpoint)
+        entry = _response_cache.peek(key, policy)
+        if entry is not None and stale is not None and policy.ttl is not None and time.time() - entry.fetched_at >= policy.ttl:
+            stale.append(day)
+        return entry
 
-    def get_exoplanets(self):
-        """Get exoplanet data from NASA Exoplanet Archive"""
-        try:
-            st.info("Fetching exoplanet data...")
-            # Using the NASA Exoplanet Archive TAP service
-            query = "select+pl_name,pl_orbper,pl_rade,pl_masse,pl_disc,sy_dist,hostname+from+ps+where+default_flag=1+order+by+pl_disc+desc+limit+50"
-            response = requests.get(
-                "https://exoplanetarchive.ipac.caltech.edu/TAP/sync",
-                params={
-                    'query': query,
-                    'format': 'json'
-                }
-            )
-            st.write(f"Exoplanet API Response Status: {response.status_code}")
-            
-            if response.status_code == 200:
-                data = response.json()
-                st.success(f"Successfully fetched {len(data)} exoplanets")
-                return data
+    def _store_window(self, endpoint, start, end, fetch_window):
+        """Fetch one window of days and cache each day; return {day: CacheEntry}"""
+        values = fetch_window(start, end)
+        return {
+            day: CacheEntry(values[day], _response_cache.set(_day_key(endpoint, day), values[day]), False)
+            for day in _days_between(start, end)
+        }
+
+    def _load_window(self, endpoint, start, end, today, fetch_window):
+        """Fetch one window of days into the cache and return {day: CacheEntry}"""
+        # Another session may have filled the window while this task was queued
+        cached = {day: self._peek_day(endpoint, day, today) for day in _days_between(start, end)}
+        if all(cached.values()):
+            return cached
+        return self._store_window(endpoint, start, end, fetch_window)
+
+    def _load_days(self, endpoint, days, fetch_window, max_days, skip_failed=False, today=None):
+        """Return {day: CacheEntry} for a dated feed cached per day under '<endpoint>_day'.
+
+        Missing days are fetched in contiguous windows of at most max_days,
+        all windows at once, and stale ones are served while being refreshed
+        in the background in windows of the same size. Days whose window
+        fails fall back to any older snapshot, flagged offline. A day with no
+        snapshot either raises the first error or, when skip_failed, is left
+        out and the days returned are flagged offline; a load left with no
+        days at all still raises. Days from today (default: the host's date)
+        on follow the endpoint's cache policy, earlier ones are final.
+        """
+        today = today or date.today()
+        per_day = {}
+        missing = []
+        stale = []
+        for day in days:
+            entry = self._peek_day(endpoint, day, today, stale)
+            if entry is None:
+                missing.append(day)
             else:
-                st.error(f"Failed to fetch exoplanet data. Status code: {response.status_code}")
-                return None
-        except Exception as e:
-            st.error(f"Error fetching exoplanet data: {str(e)}")
-            return None
+                per_day[day] = entry
+
+        for start, end in _date_windows(stale, max_days):
+            _response_cache.refresh_in_background(
+                make_key(f"{endpoint}_window", {'start_date': start.isoformat(), 'end_date': end.isoformat()}),
+                lambda start=start, end=end: self._store_window(endpoint, start, end, fetch_window)
+            )
+
+        windows = _date_windows(missing, max_days)
+        futures = [
+            _window_executor.submit(self._load_window, endpoint, start, end, today, fetch_window)
+            for start, end in windows
+        ]
+        errors = []
+        for future in futures:
+            try:
+                per_day.update(future.result())
+            except Exception as e:
+                errors.append(e)
+
+        skipped = False
+        for day in days:
+            if day not in per_day:
+                entry = _response_cache.peek(_day_key(endpoint, day), PAST_DAY_POLICY)
+                if entry is not None:
+                    per_day[day] = entry._replace(offline=True)
+                elif skip_failed and len(per_day) > 0:
+                    skipped = True
+                else:
+                    raise errors[0]
+        if skipped:
+            per_day = {day: entry._replace(offline=True) for day, entry in per_day.items()}
+        return per_day
+
+    def _load_asteroid_data(self, start_date=None, end_date=None):
+        start_date = start_date or date.today()
+        days = _days_between(start_date, end_date or start_date)
+        per_day = self._load_days('neo', days, self._fetch_neo_window, NEO_FEED_MAX_DAYS)
+
+        # Merge the per-day frames in date order, keeping each object's first
+        # approach in the range
+        from utils.neo import merge_neo_frames
+        asteroids = merge_neo_frames([_get_neo_frame(day, per_day[day].value) for day in days])
+        return CacheEntry(
+            asteroids,
+            min(entry.fetched_at for entry in per_day.values()),
+            any(entry.offline for entry in per_day.values())
+        )
+
+    def _load_apod_gallery(self, start_date=None, end_date=None):
+        # APOD has no pictures for future dates and rejects ranges that include
+        # them; its dates follow US Eastern time, not the host's clock
+        today = _apod_today()
+        end_date = min(end_date or today, today)
+        start_date = min(start_date or end_date - timedelta(days=APOD_GALLERY_DAYS - 1), end_date)
+        days = _days_between(start_date, end_date)
+        # A failed window drops its uncached days rather than the whole gallery
+        per_day = self._load_days('apod', days, self._fetch_apod_window, APOD_MAX_RANGE_DAYS, skip_failed=True, today=today)
+
+        # Newest first; days APOD skipped (or hasn't published yet) are left out
+        pictures = [per_day[day].value for day in reversed(days) if day in per_day and per_day[day].value is not None]
+        return CacheEntry(
+            pictures,
+            min(entry.fetched_at for entry in per_day.values()),
+            any(entry.offline for entry in per_day.values())
+        )
+
+    def _load_similar_planets(self, name=None, k=10):
+        if not _exoplanets_synced():
+            return CacheEntry(None, time.time(), False)
+        entry = self._load_exoplanets()
+        index = _get_similarity_index(entry.value)
+        return entry._replace(value=index.similar_to(name, k) if name is not None else index.similar_to_earth(k))
+
+    def _load_exoplanets(self, query=None):
+        # The cache tracks when the local catalog was last synced; the rows
+        # themselves live in the catalog's own SQLite table
+        catalog = _get_exoplanet_catalog(self.session, self.exoplanet_api_url)
+        if query is not None and not _exoplanets_synced() and _narrows_upstream(query):
+            # Until a first sync has completed, answer queries on the TAP
+            # service instead of waiting for the whole catalog
+            _sync_exoplanets_in_background(lambda: self._load('exoplanets'))
+            return self._query_exoplanets_upstream(catalog, query)
+
+        entry = self._cached('exoplanets', lambda: _in_flight.do(make_key('exoplanets'), catalog.refresh))
+        if query is None:
+            return entry._replace(value=catalog.frame())
+        # Answered from a cached wider result when one covers the query, else
+        # from the local catalog
+        return entry._replace(value=_get_exoplanet_queries().answer(query, catalog.version(), catalog.frame))
+
+    def _query_exoplanets_upstream(self, catalog, query):
+        from api.exoplanet_query import pushdown, to_adql, frame_from_rows
+        queries = _get_exoplanet_queries()
+
+        def fetch():
+            # Only the pushable part goes upstream, with just the columns it
+            # needs; the ADQL compiled from the normalized query is its key
+            pushed = pushdown(query)
+            params = {'query': to_adql(pushed)}
+            entry = self._cached(
+                'exoplanets',
+                lambda: _in_flight.do(make_key('exoplanets', params), lambda: catalog.fetch_rows(params['query'])),
+                params
+            )
+            frame = frame_from_rows(*entry.value)
+            queries.put(pushed, UPSTREAM_QUERIES, frame)
+            return frame
+
+        return CacheEntry(queries.answer(query, UPSTREAM_QUERIES, fetch), time.time(), False)
+
+
+def _launch_rows(launches):
+    return [{
+        'name': launch['name'],
+        'date': launch['date_utc'],
+        'details': launch.get('details', 'No details available'),
+        'rocket': launch.get('rocket', 'Unknown rocket'),
+        'launchpad': launch.get('launchpad', 'Unknown launchpad'),
+        'payloads': launch.get('payloads', [])
+    } for launch in launches]
+
+
+def _referenced_ids(launches):
+    """SpaceX IDs launch rows refer to, by collection (see api.spacex_directory)"""
+    return {
+        'rockets': {launch['rocket'] for launch in launches},
+        'launchpads': {launch['launchpad'] for launch in launches},
+        'payloads': {payload for launch in launches for payload in launch.get('payloads', [])},
+    }
+
+
+def _quota_name(url, params):
+    """Rate-limit quota a request draws from: its API key (masked) or else its host"""
+    host = urlsplit(url).hostname
+    api_key = (params or {}).get('api_key')
+    if not api_key:
+        return host
+    return f"{host} key {api_key if api_key == 'DEMO_KEY' else '…' + api_key[-4:]}"
+
+
+def rate_limits():
+    """Return [(quota, limit, remaining, observed_at)] as last reported by upstream"""
+    return _scheduler.quotas()
+
+
+def refresh_schedule():
+    """Return [(endpoint, priority, stretch, effective CachePolicy)] for every cached endpoint"""
+    return [(endpoint, REFRESH_PRIORITIES[endpoint], _scheduler.stretch(endpoint), _scheduler.policy(endpoint))
+            for endpoint in CACHE_POLICIES]
+
+
+def _days_between(start, end):
+    """Dates from start to end inclusive"""
+    return [start + timedelta(days=i) for i in range((end - start).days + 1)]
+
+
+def _date_windows(days, max_days):
+    """Group sorted days into contiguous (start, end) windows of at most max_days"""
+    windows = []
+    for day in days:
+        if windows and day - windows[-1][1] == timedelta(days=1) and (day - windows[-1][0]).days < max_days:
+            windows[-1] = (windows[-1][0], day)
+        else:
+            windows.append((day, day))
+    return windows
+
+
+def _apod_today():
+    """The newest date APOD can have published, in its own (US Eastern) calendar"""
+    return datetime.now(pytz.timezone('US/Eastern')).date()
+
+
+def _day_key(endpoint, day):
+    return make_key(f"{endpoint}_day", {'date': day.isoformat()})
+
+
+def _end_of_day(day):
+    return datetime.combine(day + timedelta(days=1), dtime.min).timestamp()
+
+
+def _get_iss_tracker(fetch):
+    global _iss_tracker
+    with _iss_tracker_lock:
+        if _iss_tracker is None:
+            from api.iss_tracker import ISSTracker
+            _iss_tracker = ISSTracker(fetch)
+            _iss_tracker.start()
+        return _iss_tracker
+
+
+def _get_neo_frame(day, objects):
+    with _neo_frames_lock:
+        payload, frame = _neo_frames.get(day, (None, None))
+        if payload is not objects:
+            from utils.neo import normalize_neos
+            frame = normalize_neos(objects)
+            _neo_frames[day] = (objects, frame)
+        return frame
+
+
+def _get_launch_index(launches, directory):
+    # Parse and sort once per payload and directory generation rather than on
+    # every rerun. resolve() runs on every load but only requests IDs it
+    # hasn't seen (or whose lookup failed over RETRY_AFTER seconds ago), so
+    # an index built while a lookup was failing is rebuilt once it recovers.
+    global _launch_index
+    entities = directory.resolve(_referenced_ids(launches))
+    generation = directory.generation
+    with _launch_index_lock:
+        built_for, index = _launch_index
+        if built_for is None or built_for[0] is not launches or built_for[1] != generation:
+            index = LaunchIndex(launches, entities)
+            _launch_index = ((launches, generation), index)
+        return index
+
+
+def _get_spacex_directory(session, api_url):
+    global _spacex_directory
+    with _spacex_directory_lock:
+        if _spacex_directory is None:
+            from api.spacex_directory import SpaceXDirectory
+            _spacex_directory = SpaceXDirectory(session, api_url, _window_executor)
+        return _spacex_directory
+
+
+def _get_exoplanet_catalog(session, api_url):
+    global _exoplanet_catalog
+    with _exoplanet_catalog_lock:
+        if _exoplanet_catalog is None:
+            from api.exoplanet_catalog import ExoplanetCatalog
+            _exoplanet_catalog = ExoplanetCatalog(session, api_url)
+        return _exoplanet_catalog
+
+
+def _sync_exoplanets_in_background(sync):
+    """Run sync on the worker pool unless a previous background sync is still running"""
+    global _exoplanet_sync
+    with _exoplanet_sync_lock:
+        if _exoplanet_sync is None or _exoplanet_sync.done():
+            _exoplanet_sync = _executor.submit(sync)
+
+
+def _get_exoplanet_queries():
+    global _exoplanet_queries
+    with _exoplanet_catalog_lock:
+        if _exoplanet_queries is None:
+            from api.exoplanet_query import QueryCache
+            _exoplanet_queries = QueryCache()
+        return _exoplanet_queries
+
+
+def _exoplanets_synced():
+    """True once a first full sync of the local exoplanet catalog has completed"""
+    return _response_cache.fetched_at(make_key('exoplanets')) is not None
+
+
+def _narrows_upstream(query):
+    """True when the TAP service can cut query down to fewer rows than the whole catalog.
+
+    A query it can't narrow would download every row alongside the first sync,
+    so it's cheaper to wait for (or join) the sync instead.
+    """
+    from api.exoplanet_query import pushdown
+    pushed = pushdown(query)
+    return bool(pushed.filters) or pushed.limit is not None
+
+
+def _get_similarity_index(frame):
+    # The KD-tree is built once per catalog version; frame() returns the same
+    # object until the catalog changes
+    global _similarity_index
+    with _similarity_index_lock:
+        payload, index = _similarity_index
+        if payload is not frame:
+            from utils.exoplanet_similarity import SimilarityIndex
+            with metrics.timer('similarity_index_build_seconds'):
+                index = SimilarityIndex(frame)
+            _similarity_index = (frame, index)
+        return index
+
+
+def _get_image_cache(session):
+    global _image_cache
+    with _image_cache_lock:
+        if _image_cache is None:
+            from api.image_cache import ImageCache
+            _image_cache = ImageCache(session)
+        return _image_cache
+
+
+def warm_up():
+    """Prefetch every endpoint once per process so the first visitor finds a warm cache"""
+    global _warmed_up
+    if _warmed_up:
+        return
+    _warmed_up = True
+    SpaceAPI().prefetch()
@@ -0,0 +1,104 @@
+import threading
+import time
+import requests
+from api.session import allow_post_retries
+from api.singleflight import SingleFlight
+from utils import metrics
+
+# Collections launches refer to by ID: collection -> fields kept per entity
+COLLECTIONS = {
+    'rockets': ('name',),
+    'launchpads': ('name', 'full_name', 'locality', 'region'),
+    'payloads': ('name', 'type', 'orbit', 'mass_kg', 'customers'),
+}
+
+# Seconds before IDs whose lookup failed are asked for again
+RETRY_AFTER = 60
+
+
+class SpaceXDirectory:
+    """Long-lived ID -> entity dictionary for the SpaceX rockets, launchpads and payloads.
+
+    resolve() looks up only IDs it hasn't seen, with one POST to the v4
+    /query endpoint per collection, all in flight at once, so enriching a
+    batch of launches costs at most one extra round-trip and later batches
+    usually none. IDs upstream doesn't know are remembered as None.
+    """
+
+    def __init__(self, session, api_url, executor):
+        self.session = session
+        self.api_url = api_url
+        self.executor = executor
+        self.entities = {collection: {} for collection in COLLECTIONS}
+        # Bumped whenever a lookup adds to entities, so views built from them
+        # know to rebuild
+        self.generation = 0
+        self._failed_at = {}
+        self._in_flight = SingleFlight()
+        self._lock = threading.Lock()
+        for collection in COLLECTIONS:
+            allow_post_retries(session, self._query_url(collection))
+
+    def _query_url(self, collection):
+        return f"{self.api_url}/{collection}/query"
+
+    def resolve(self, ids):
+        """Look up the unseen IDs in ids ({collection: iterable of IDs}) and return self.entities.
+
+        A collection whose lookup fails is skipped, and not asked again for
+        RETRY_AFTER seconds; its IDs simply stay unresolved.
+        """
+        now = time.time()
+        with self._lock:
+            missing = {}
+            for collection, wanted in ids.items():
+                if now - self._failed_at.get(collection, 0) < RETRY_AFTER:
+                    continue
+                known = self.entities[collection]
+                unseen = sorted({i for i in wanted if i and i not in known})
+                if unseen:
+                    missing[collection] = unseen
+        if not missing:
+            return self.entities
+
+        futures = {
+            # Sessions resolving the same IDs at once share one request
+            collection: self.executor.submit(
+                self._in_flight.do, (collection, tuple(unseen)), lambda c=collection, u=unseen: self._query(c, u)
+            )
+            for collection, unseen in missing.items()
+        }
+        for collection, future in futures.items():
+            try:
+                found = future.result()
+            except requests.RequestException:
+                with self._lock:
+                    self._failed_at[collection] = time.time()
+                continue
+            with self._lock:
+                known = self.entities[collection]
+                for entity_id in missing[collection]:
+                    known[entity_id] = found.get(entity_id)
+                self.generation += 1
+        return self.entities
+
+    def _query(self, collection, ids):
+        fields = COLLECTIONS[collection]
+        body = {
+            'query': {'_id': {'$in': ids}},
+            'options': {'pagination': False, 'select': ['id', *fields]},
+        }
+        started = time.perf_counter()
+        try:
+            response = self.session.post(self._query_url(collection), json=body)
+        except requests.RequestException:
+            metrics.increment('spaceapi_requests_total', endpoint=collection, status='error')
+            raise
+        metrics.observe('spaceapi_request_seconds', time.perf_counter() - started, endpoint=collection)
+        metrics.observe('spaceapi_response_bytes', len(response.content), metrics.BYTES_BUCKETS, endpoint=collection)
+        metrics.increment('spaceapi_requests_total', endpoint=collection, status=str(response.status_code))
+        response.raise_for_status()
+        return {
+            doc['id']: {field: doc.get(field) for field in fields}
+            for doc in response.json().get('docs', [])
+        }
@@ -0,0 +1,86 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+
+DATA_DIR = Path(os.getenv('SPACE_TRACKER_DATA_DIR', Path(__file__).resolve().parent.parent / 'data'))
+DEFAULT_PATH = DATA_DIR / 'responses.sqlite3'
+
+_SCHEMA = """
+create table if not exists responses (
+    endpoint text not null,
+    params text not null,
+    payload blob not null,
+    fetched_at real not null,
+    stored_at real not null,
+    primary key (endpoint, params)
+)
+"""
+
+
+class ResponseStore:
+    """SQLite-backed snapshot of the last good response per endpoint and parameters.
+
+    Payloads are stored as zlib-compressed JSON together with the wall-clock
+    time they were fetched, so a restarted process can serve them at once and
+    keep serving them when the upstream API is unreachable. Storage errors are
+    swallowed: the store is an optimisation and must never break a page.
+    """
+
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connect(self):
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            # WAL lets several app processes on one host share the file
+            conn.execute("pragma journal_mode=wal")
+            conn.execute("pragma synchronous=normal")
+            conn.execute(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def get(self, key):
+        """Return (value, fetched_at) for a cache key, or None when nothing is stored"""
+        endpoint, params = _split_key(key)
+        try:
+            with self._lock:
+                row = self._connect().execute(
+                    "select payload, fetched_at from responses where endpoint = ? and params = ?",
+                    (endpoint, params)
+                ).fetchone()
+        except (sqlite3.Error, OSError):
+            return None
+        if row is None:
+            return None
+        try:
+            return json.loads(zlib.decompress(row[0])), row[1]
+        except (zlib.error, ValueError, TypeError):
+            # A truncated or corrupt snapshot is treated as missing
+            return None
+
+    def put(self, key, value, fetched_at):
+        """Persist value for a cache key, replacing any older snapshot"""
+        endpoint, params = _split_key(key)
+        try:
+            payload = zlib.compress(json.dumps(value, separators=(',', ':')).encode('utf-8'))
+            with self._lock:
+                conn = self._connect()
+                conn.execute(
+                    "insert or replace into responses values (?, ?, ?, ?, ?)",
+                    (endpoint, params, payload, fetched_at, time.time())
+                )
+                conn.commit()
+        except (sqlite3.Error, OSError, TypeError):
+            pass
+
+
+def _split_key(key):
+    endpoint, params = key
+    return endpoint, json.dumps(dict(params), sort_keys=True, default=str)
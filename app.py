@@ -2,11 +2,11 @@ import streamlit as st
 import os
 from dotenv import load_dotenv
 from datetime import datetime
+import importlib
 import pytz
-from components.rocket_launches import show_rocket_launches
-from components.exoplanet_explorer import show_exoplanet_explorer
-from components.live_data import show_live_space_data
+from api.space_data import warm_up
 from utils.helpers import get_random_space_fact
+from utils import metrics
 
 # Load environment variables
 load_dotenv()
@@ -16,6 +16,10 @@ if not os.getenv('NASA_API_KEY'):
     st.error("NASA API key not found. Please add it to your .env file.")
     st.stop()
 
+# Optionally prefetch every page's data in the background when the process starts
+if os.getenv('SPACE_TRACKER_WARM_UP', 'true').lower() == 'true':
+    warm_up()
+
 # Page configuration
 st.set_page_config(
     page_title="Personal Space Tracker",
@@ -36,15 +40,7 @@ st.sidebar.markdown("**🌟 Random Space Fact**")
 st.sidebar.markdown(get_random_space_fact())
 st.sidebar.markdown("---")
 
-# Sidebar navigation
-st.sidebar.title("Navigation")
-page = st.sidebar.radio(
-    "Select a Page",
-    ["Home", "Rocket Launches", "Exoplanet Explorer", "Live Space Data"]
-)
-
-# Import page modules based on selection
-if page == "Home":
+def show_home():
     st.header("Welcome to Personal Space Tracker!")
     
     # Display current time in different time zones
@@ -70,16 +66,43 @@ if page == "Home":
         - 🌍 **Exoplanet Discoveries**: Explore newly found worlds beyond our solar system
         - ☄️ **Astronomy Events**: Track celestial events and phenomena
         - 🛸 **ISS Tracker**: Follow the International Space Station in real-time
+        - 🔭 **Astronomy Pictures**: Browse NASA's Astronomy Picture of the Day archive
     """)
 
-elif page == "Rocket Launches":
-    show_rocket_launches()
+# Page name -> (module, function). Page modules pull in pandas, numpy and
+# Plotly, so each is imported only when its page is first selected.
+PAGES = {
+    "Rocket Launches": ("components.rocket_launches", "show_rocket_launches"),
+    "Exoplanet Explorer": ("components.exoplanet_explorer", "show_exoplanet_explorer"),
+    "Live Space Data": ("components.live_data", "show_live_space_data"),
+    "Astronomy Pictures": ("components.apod_gallery", "show_apod_gallery"),
+    "Diagnostics": ("components.diagnostics", "show_diagnostics"),
+}
 
-elif page == "Exoplanet Explorer":
-    show_exoplanet_explorer()
+def load_page(page):
+    module_name, function_name = PAGES[page]
+    # Only the first import in a process does any work; later reruns hit sys.modules
+    with metrics.timer('page_import_seconds', page=page):
+        module = importlib.import_module(module_name)
+    return getattr(module, function_name)
+
+# Sidebar navigation
+st.sidebar.title("Navigation")
+pages = ["Home", "Rocket Launches", "Exoplanet Explorer", "Live Space Data", "Astronomy Pictures"]
+# The diagnostics page is hidden unless the URL carries ?diagnostics=1
+if st.query_params.get("diagnostics") == "1":
+    pages.append("Diagnostics")
+page = st.sidebar.radio(
+    "Select a Page",
+    pages
+)
 
-elif page == "Live Space Data":
-    show_live_space_data()
+# Page modules based on selection; the whole page script is timed
+with metrics.timer('page_script_seconds', page=page):
+    if page == "Home":
+        show_home()
+    else:
+        load_page(page)()
 
 # Footer
 st.markdown("---")
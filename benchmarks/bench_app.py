@@ -0,0 +1,267 @@
+"""Headless app benchmark against the local replay server.
+
+Starts benchmarks.replay_server with synthetic payloads, then drives app.py
+and each show_* page through Streamlit's AppTest, one fresh process per
+target so the first run is a true cold start. Reports cold and warm script
+run time, peak memory and upstream request counts.
+
+Then replays a few widget interactions per page on app.py and reports two
+comparisons, each measured the same way on both sides:
+
+- full: AppTest wall time of the whole app rerun. AppTest always reruns
+  everything, so after fragments this is memoized stages and cached figures
+  rather than what a browser runs.
+- script: time inside the script's own page_script_seconds timers. Before
+  fragments that is the page function, which an interaction reran in full;
+  after, the page's fragment, which is all a fragment-scoped rerun executes.
+  Neither includes Streamlit's runner or delivering elements to the browser.
+
+"before" columns come from --baseline REV: the same interactions replayed on
+app.py as of REV, checked out into a temporary git worktree. Without it no
+baseline is measured.
+
+Run from the project root:
+    python -m benchmarks.bench_app [--launches 10000 --exoplanets 30000 --neos 5000]
+                                   [--latency 0.05 --error-rate 0.01] [--warm-runs 5]
+                                   [--baseline REV]
+"""
+import argparse
+import json
+import os
+import resource
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.replay_server import add_server_arguments, server_from_args
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# name -> (module, function); None runs app.py itself (the Home page)
+TARGETS = {
+    'app.py (Home)': None,
+    'Rocket Launches': ('components.rocket_launches', 'show_rocket_launches'),
+    'Exoplanet Explorer': ('components.exoplanet_explorer', 'show_exoplanet_explorer'),
+    'Live Space Data': ('components.live_data', 'show_live_space_data'),
+    'Astronomy Pictures': ('components.apod_gallery', 'show_apod_gallery'),
+}
+
+
+def _labelled(widgets, label):
+    # Filters moved out of the sidebar and gained keys along with fragments;
+    # their labels are the same in both, so a baseline finds them too
+    return next(widget for widget in widgets if widget.label == label)
+
+
+def _first_view_button(at):
+    return next(button for button in at.button if button.key.startswith('apod_view_'))
+
+
+# Page -> (fragment timer label, [(interaction, action on the AppTest)]),
+# replayed in order on app.py with that page selected
+INTERACTIONS = {
+    'Rocket Launches': ('Rocket Launches (fragment)', [
+        ('organization -> SpaceX', lambda at: _labelled(at.selectbox, 'Organization').set_value('SpaceX')),
+    ]),
+    'Exoplanet Explorer': ('Exoplanet Explorer (fragment)', [
+        ('radius slider 1-3', lambda at: _labelled(at.slider, 'Planet Radius (Earth Radii)').set_value((1.0, 3.0))),
+        ('details page 2', lambda at: at.number_input(key='exoplanet_details_page').set_value(2)),
+    ]),
+    'Live Space Data': ('Near-Earth Objects (fragment)', [
+        ('hazardous only', lambda at: at.checkbox(key='neo_hazardous_only').check()),
+        ('details page 2', lambda at: at.number_input(key='neo_details_page').set_value(2)),
+    ]),
+    'Astronomy Pictures': ('Astronomy Pictures (fragment)', [
+        ('load more', lambda at: at.button(key='apod_more').click()),
+        ('view a picture', lambda at: _first_view_button(at).click()),
+    ]),
+}
+
+
+def page_script(module_name, function_name):
+    # Runs inside AppTest as the whole script
+    import importlib
+    getattr(importlib.import_module(module_name), function_name)()
+
+
+def _upstream_requests():
+    from utils import metrics
+    return sum(value for name, _, value in metrics.registry.counters() if name == 'spaceapi_requests_total')
+
+
+def _script_seconds(label):
+    """Total page_script_seconds recorded under label, or None when nothing has been"""
+    from utils import metrics
+    for name, labels, summary in metrics.registry.histograms():
+        if name == 'page_script_seconds' and labels.get('page') == label:
+            return summary['sum']
+    return None
+
+
+def _peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def worker_env(server, data_dir):
+    """Environment for a worker process: replay server URLs and a throwaway data dir"""
+    return dict(
+        os.environ,
+        **server.env(),
+        NASA_API_KEY=os.getenv('NASA_API_KEY', 'DEMO_KEY'),
+        SPACE_TRACKER_DATA_DIR=data_dir,
+        SPACE_TRACKER_WARM_UP='false',
+        PYTHONPATH=str(ROOT)
+    )
+
+
+def run_worker(target, warm_runs, timeout, app_root=ROOT):
+    """Measure one target of the app in app_root in this process and print a JSON result line"""
+    # The app's own packages (api, components, utils) come from app_root
+    sys.path.insert(0, str(app_root))
+    from streamlit.testing.v1 import AppTest
+
+    if TARGETS[target] is None:
+        at = AppTest.from_file(str(Path(app_root) / 'app.py'), default_timeout=timeout)
+    else:
+        at = AppTest.from_function(page_script, args=TARGETS[target], default_timeout=timeout)
+
+    def timed_run():
+        before = _upstream_requests()
+        started = time.perf_counter()
+        at.run()
+        return time.perf_counter() - started, _upstream_requests() - before
+
+    cold, cold_requests = timed_run()
+    cold_rss = _peak_rss_mb()
+    warm = [timed_run() for _ in range(warm_runs)]
+
+    interactions = []
+    if target in INTERACTIONS:
+        fragment, steps = INTERACTIONS[target]
+        app = AppTest.from_file(str(Path(app_root) / 'app.py'), default_timeout=timeout)
+        app.run()
+        app.sidebar.radio[0].set_value(target).run()
+        app.run()
+        for label, act in steps:
+            act(app)
+            # A fragment-scoped rerun runs only the fragment; an app without
+            # one (a baseline from before fragments) reran the whole page
+            timer = fragment if _script_seconds(fragment) is not None else target
+            script_before = _script_seconds(timer) or 0.0
+            started = time.perf_counter()
+            app.run()
+            interactions.append({
+                'label': label,
+                'full_rerun_s': time.perf_counter() - started,
+                'script_s': _script_seconds(timer) - script_before,
+                'exceptions': [e.message for e in app.exception],
+            })
+
+    print(json.dumps({
+        'target': target,
+        'cold_s': cold,
+        'cold_requests': cold_requests,
+        'cold_rss_mb': cold_rss,
+        'warm_s': statistics.median(t for t, _ in warm),
+        'warm_requests': sum(r for _, r in warm),
+        'peak_rss_mb': _peak_rss_mb(),
+        'interactions': interactions,
+        'exceptions': [e.message for e in at.exception],
+    }))
+
+
+def _run_workers(server, args, app_root=ROOT):
+    results = []
+    for target in args.targets or TARGETS:
+        with tempfile.TemporaryDirectory() as data_dir:
+            env = worker_env(server, data_dir)
+            served_before = sum(server.requests.values())
+            output = subprocess.run(
+                [sys.executable, '-m', 'benchmarks.bench_app', '--worker', target, '--app-root', str(app_root),
+                 '--warm-runs', str(args.warm_runs), '--timeout', str(args.timeout)],
+                cwd=ROOT, env=env, capture_output=True, text=True
+            )
+            lines = [line for line in output.stdout.splitlines() if line.startswith('{')]
+            if not lines:
+                print(f"{target}: worker failed\n{output.stderr[-2000:]}")
+                continue
+            result = json.loads(lines[-1])
+            result['served'] = sum(server.requests.values()) - served_before
+            results.append(result)
+    return results
+
+
+def _baseline_interactions(server, args):
+    """{(target, interaction): interaction result} replayed on app.py as of args.baseline"""
+    tree = tempfile.mkdtemp(prefix='bench-baseline-')
+    subprocess.run(['git', 'worktree', 'add', '--detach', tree, args.baseline], cwd=ROOT, check=True, capture_output=True)
+    try:
+        results = _run_workers(server, argparse.Namespace(**{**vars(args), 'targets': [
+            target for target in args.targets or TARGETS if target in INTERACTIONS
+        ]}), tree)
+    finally:
+        subprocess.run(['git', 'worktree', 'remove', '--force', tree], cwd=ROOT, capture_output=True)
+        shutil.rmtree(tree, ignore_errors=True)
+    return {(r['target'], i['label']): i for r in results for i in r['interactions']}
+
+
+def run(args):
+    server = server_from_args(args).start()
+    print(f"Replay server: {args.launches} launches, {args.exoplanets} exoplanets, "
+          f"{args.neos} NEOs/week, latency {args.latency}s, error rate {args.error_rate}")
+    try:
+        results = _run_workers(server, args)
+        baseline = _baseline_interactions(server, args) if args.baseline else {}
+    finally:
+        server.stop()
+
+    print()
+    print(f"{'target':22} {'cold s':>8} {'warm s':>8} {'cold req':>9} {'warm req':>9} "
+          f"{'served':>7} {'cold MB':>8} {'peak MB':>8}")
+    for r in results:
+        print(f"{r['target']:22} {r['cold_s']:8.3f} {r['warm_s']:8.3f} {r['cold_requests']:9d} "
+              f"{r['warm_requests']:9d} {r['served']:7d} {r['cold_rss_mb']:8.1f} {r['peak_rss_mb']:8.1f}")
+        for message in r['exceptions']:
+            print(f"  exception: {message}")
+
+    if any(r['interactions'] for r in results):
+        print()
+        if args.baseline:
+            print(f"before: {args.baseline}; full = AppTest rerun, script = page (before) / fragment (after) timer")
+        else:
+            print("before: not measured (pass --baseline REV); script = fragment timer")
+        print(f"{'interaction':45} {'full before':>11} {'full after':>10} {'script before':>13} "
+              f"{'script after':>12} {'script speedup':>14}")
+        for r in results:
+            for i in r['interactions']:
+                before = baseline.get((r['target'], i['label']))
+                full_before = f"{before['full_rerun_s']:11.3f}" if before else f"{'-':>11}"
+                script_before = f"{before['script_s']:13.3f}" if before else f"{'-':>13}"
+                speedup = (
+                    f"{before['script_s'] / i['script_s']:13.1f}x" if before and i['script_s'] else f"{'-':>14}"
+                )
+                print(f"{r['target'] + ': ' + i['label']:45} {full_before} {i['full_rerun_s']:10.3f} "
+                      f"{script_before} {i['script_s']:12.3f} {speedup}")
+                for message in i['exceptions'] + (before['exceptions'] if before else []):
+                    print(f"  exception: {message}")
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    add_server_arguments(parser)
+    parser.add_argument('--warm-runs', type=int, default=3, help="warm reruns per target (median reported)")
+    parser.add_argument('--timeout', type=float, default=120, help="seconds allowed per script run")
+    parser.add_argument('--targets', nargs='*', choices=list(TARGETS), help="subset of targets to run")
+    parser.add_argument('--baseline', help="git revision the same interactions are replayed on for the 'before' columns")
+    parser.add_argument('--worker', help=argparse.SUPPRESS)
+    parser.add_argument('--app-root', default=str(ROOT), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.worker:
+        run_worker(args.worker, args.warm_runs, args.timeout, args.app_root)
+    else:
+        run(args)
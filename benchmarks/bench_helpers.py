@@ -0,0 +1,38 @@
+"""Micro-benchmarks for utils.helpers.
+
+Run from the project root:
+    python -m benchmarks.bench_helpers [launch_count]
+"""
+import sys
+import timeit
+from datetime import datetime
+
+from benchmarks.bench_launch_filter import make_launches
+from utils import helpers
+
+
+def run(count=5000, repeat=5):
+    launches = make_launches(count)
+    dates = [launch['date'] for launch in launches]
+    numbers = [i * 1234.5678 for i in range(count)]
+    start = datetime(2015, 1, 1)
+    end = datetime(2016, 1, 1)
+
+    cases = [
+        ("format_datetime", lambda: [helpers.format_datetime(d) for d in dates], count),
+        ("calculate_time_until", lambda: [helpers.calculate_time_until(d) for d in dates], count),
+        ("format_number", lambda: [helpers.format_number(n) for n in numbers], count),
+        ("calculate_distance_au_to_ly", lambda: [helpers.calculate_distance_au_to_ly(n) for n in numbers], count),
+        ("get_hazard_emoji", lambda: [helpers.get_hazard_emoji(i % 2) for i in range(count)], count),
+        ("filter_launches (date + org)", lambda: helpers.filter_launches(launches, start, end, "SpaceX"), 1),
+        ("get_random_space_fact", lambda: [helpers.get_random_space_fact() for _ in range(count)], count),
+    ]
+
+    print(f"{'function':32} {'per call':>12} {'calls':>8}")
+    for name, func, calls in cases:
+        best = min(timeit.repeat(func, number=1, repeat=repeat))
+        print(f"{name:32} {best / calls * 1e6:9.2f} us {calls:8d}")
+
+
+if __name__ == '__main__':
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
@@ -0,0 +1,61 @@
+"""Micro-benchmark: LaunchIndex.filter against utils.helpers.filter_launches.
+
+Run from the project root:
+    python -m benchmarks.bench_launch_filter [launch_count]
+"""
+import random
+import sys
+import timeit
+from datetime import datetime, timedelta
+
+from utils.helpers import filter_launches
+from utils.launches import LaunchIndex
+
+ORGANIZATIONS = ["SpaceX", "NASA", "ULA", "Rocket Lab", "Arianespace", "ISRO"]
+
+
+def make_launches(count, seed=0):
+    """Return count synthetic launch dicts shaped like SpaceAPI.get_upcoming_launches output"""
+    rng = random.Random(seed)
+    epoch = datetime(2006, 1, 1)
+    launches = []
+    for i in range(count):
+        date = epoch + timedelta(minutes=rng.randrange(0, 20 * 365 * 24 * 60))
+        launches.append({
+            'name': f"{rng.choice(ORGANIZATIONS)} Mission {i}",
+            'date': date.strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+            'details': None,
+            'rocket': 'rocket-id',
+            'launchpad': 'launchpad-id'
+        })
+    return launches
+
+
+def run(count=5000, repeat=20):
+    launches = make_launches(count)
+    start = datetime(2015, 1, 1)
+    end = datetime(2015, 4, 1)
+
+    def baseline():
+        return filter_launches(launches, start_date=start, end_date=end, organization="SpaceX")
+
+    build = min(timeit.repeat(lambda: LaunchIndex(launches), number=1, repeat=5))
+    index = LaunchIndex(launches)
+
+    def indexed():
+        return index.filter(start_date=start, end_date=end, organization="SpaceX")
+
+    assert [l['name'] for l in sorted(baseline(), key=lambda l: l['date'])] == [l.name for l in indexed()]
+
+    baseline_time = min(timeit.repeat(baseline, number=1, repeat=repeat))
+    indexed_time = min(timeit.repeat(indexed, number=1, repeat=repeat))
+
+    print(f"launches:              {count}")
+    print(f"filter_launches:       {baseline_time * 1e3:9.3f} ms per filter")
+    print(f"LaunchIndex build:     {build * 1e3:9.3f} ms once per payload")
+    print(f"LaunchIndex.filter:    {indexed_time * 1e3:9.3f} ms per filter")
+    print(f"speedup per filter:    {baseline_time / indexed_time:9.1f}x")
+
+
+if __name__ == '__main__':
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
@@ -0,0 +1,169 @@
+"""Startup budget: process cold start and first paint per page.
+
+Spawns a fresh interpreter per page against the local replay server and
+measures the time to import Streamlit (process cold start) and the time from
+spawn until the page's first script run has finished (first paint). Also
+records which heavy libraries the render path imported; background prefetch
+threads may import them, the page script itself must not when the budget
+says so. Exits non-zero when any page is over budget, so it can gate a
+release, and --output appends the results as a JSON line to track them
+across releases.
+
+Run from the project root:
+    python -m benchmarks.bench_startup [--output benchmarks/startup_history.jsonl]
+"""
+import argparse
+import importlib.abc
+import json
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+# Seconds, measured on a developer laptop against the replay server with
+# default sizes; raise deliberately, never silently
+STARTUP_BUDGET = 1.5
+FIRST_PAINT_BUDGETS = {
+    'app.py (Home)': 2.5,
+    'Rocket Launches': 3.0,
+    'Exoplanet Explorer': 4.0,
+    'Live Space Data': 3.5,
+    'Astronomy Pictures': 3.0,
+}
+# Libraries each page's own render may import (None: anything)
+RENDER_IMPORT_BUDGETS = {
+    'app.py (Home)': set(),
+    'Rocket Launches': None,
+    'Exoplanet Explorer': None,
+    'Live Space Data': None,
+    'Astronomy Pictures': None,
+}
+HEAVY_MODULES = ('pandas', 'numpy', 'pyarrow', 'plotly.express', 'scipy')
+# Threads that belong to the app's background work rather than the render
+BACKGROUND_THREADS = ('space-api', 'cache-refresh', 'iss-tracker')
+
+
+class ImportRecorder(importlib.abc.MetaPathFinder):
+    """Records which thread first imported each heavy module; never finds anything itself"""
+
+    def __init__(self):
+        self.imports = {}
+
+    def find_spec(self, name, path=None, target=None):
+        if name in HEAVY_MODULES and name not in sys.modules and name not in self.imports:
+            self.imports[name] = threading.current_thread().name
+        return None
+
+    def render_imports(self):
+        return sorted(name for name, thread in self.imports.items() if not thread.startswith(BACKGROUND_THREADS))
+
+
+def run_worker(target, timeout):
+    """Measure one cold start in this process and print a JSON result line"""
+    recorder = ImportRecorder()
+    sys.meta_path.insert(0, recorder)
+
+    from streamlit.testing.v1 import AppTest
+    streamlit_imported = time.time()
+    # Whatever Streamlit loads for itself is not charged to the page
+    recorder.imports.clear()
+
+    from benchmarks.bench_app import ROOT, TARGETS, page_script
+    if TARGETS[target] is None:
+        at = AppTest.from_file(str(ROOT / 'app.py'), default_timeout=timeout)
+    else:
+        at = AppTest.from_function(page_script, args=TARGETS[target], default_timeout=timeout)
+    started = time.perf_counter()
+    at.run()
+    first_run = time.perf_counter() - started
+
+    print(json.dumps({
+        'target': target,
+        'streamlit_imported': streamlit_imported,
+        'first_paint': time.time(),
+        'first_run_s': first_run,
+        'render_imports': recorder.render_imports(),
+        'background_imports': sorted(set(recorder.imports) - set(recorder.render_imports())),
+        'exceptions': [e.message for e in at.exception],
+    }))
+
+
+def over_budget(result):
+    problems = []
+    if result['startup_s'] > STARTUP_BUDGET:
+        problems.append(f"startup {result['startup_s']:.2f}s > {STARTUP_BUDGET}s")
+    budget = FIRST_PAINT_BUDGETS.get(result['target'])
+    if budget is not None and result['first_paint_s'] > budget:
+        problems.append(f"first paint {result['first_paint_s']:.2f}s > {budget}s")
+    allowed = RENDER_IMPORT_BUDGETS.get(result['target'])
+    if allowed is not None:
+        extra = set(result['render_imports']) - allowed
+        if extra:
+            problems.append(f"render imported {', '.join(sorted(extra))}")
+    if result['exceptions']:
+        problems.append("script raised")
+    return problems
+
+
+def run(args):
+    from benchmarks.bench_app import ROOT, TARGETS, worker_env
+    from benchmarks.replay_server import server_from_args
+
+    server = server_from_args(args).start()
+    results = []
+    try:
+        for target in args.targets or TARGETS:
+            with tempfile.TemporaryDirectory() as data_dir:
+                spawned = time.time()
+                output = subprocess.run(
+                    [sys.executable, '-m', 'benchmarks.bench_startup', '--worker', target, '--timeout', str(args.timeout)],
+                    cwd=ROOT, env=worker_env(server, data_dir), capture_output=True, text=True
+                )
+            lines = [line for line in output.stdout.splitlines() if line.startswith('{')]
+            if not lines:
+                print(f"{target}: worker failed\n{output.stderr[-2000:]}")
+                results.append({'target': target, 'startup_s': float('inf'), 'first_paint_s': float('inf'),
+                                'first_run_s': float('inf'), 'render_imports': [], 'background_imports': [],
+                                'exceptions': ['worker failed']})
+                continue
+            result = json.loads(lines[-1])
+            result['startup_s'] = result.pop('streamlit_imported') - spawned
+            result['first_paint_s'] = result.pop('first_paint') - spawned
+            results.append(result)
+    finally:
+        server.stop()
+
+    failed = False
+    print(f"{'target':22} {'startup s':>10} {'first run s':>12} {'first paint s':>14}  render imports")
+    for r in results:
+        problems = over_budget(r)
+        failed = failed or bool(problems)
+        print(f"{r['target']:22} {r['startup_s']:10.3f} {r['first_run_s']:12.3f} {r['first_paint_s']:14.3f}  "
+              f"{', '.join(r['render_imports']) or '-'}")
+        for problem in problems:
+            print(f"  OVER BUDGET: {problem}")
+        for message in r['exceptions']:
+            print(f"  exception: {message}")
+
+    if args.output:
+        with open(args.output, 'a') as f:
+            f.write(json.dumps({'measured_at': datetime.now().isoformat(timespec='seconds'), 'results': results}) + "\n")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--worker', help=argparse.SUPPRESS)
+    parser.add_argument('--timeout', type=float, default=120, help="seconds allowed per script run")
+    args, rest = parser.parse_known_args()
+    if args.worker:
+        run_worker(args.worker, args.timeout)
+    else:
+        from benchmarks.bench_app import TARGETS
+        from benchmarks.replay_server import add_server_arguments
+        add_server_arguments(parser)
+        parser.add_argument('--targets', nargs='*', choices=list(TARGETS), help="subset of targets to run")
+        parser.add_argument('--output', help="append results as a JSON line to this file")
+        sys.exit(run(parser.parse_args()))
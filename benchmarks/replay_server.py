@@ -0,0 +1,447 @@
+"""Local stand-in for the NASA, SpaceX, Open Notify and Exoplanet Archive APIs.
+
+Serves recorded fixtures from a directory when present and otherwise
+synthetic payloads of configurable size, with optional latency and error
+injection. Run standalone to point a local app at it:
+
+    python -m benchmarks.replay_server --port 8765 --launches 10000 --exoplanets 30000 --neos 5000
+    SPACEX_API_URL=http://127.0.0.1:8765/v4 NASA_API_URL=http://127.0.0.1:8765 \\
+    OPEN_NOTIFY_API_URL=http://127.0.0.1:8765 EXOPLANET_API_URL=http://127.0.0.1:8765/TAP/sync \\
+    streamlit run app.py
+
+Recorded fixtures are looked up as <fixtures_dir>/<route>.json, where route
+is the request path with slashes replaced by underscores, e.g.
+v4_launches_upcoming.json or iss-now.json.
+"""
+import argparse
+import csv
+import gzip
+import hashlib
+import io
+import json
+import math
+import random
+import re
+import threading
+import time
+from datetime import date, datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+ORBIT_SECONDS = 5554
+ORGANIZATIONS = ["SpaceX", "NASA", "ULA", "Rocket Lab", "Arianespace", "ISRO"]
+SPACEX_ROCKETS = ["Falcon 9", "Falcon Heavy", "Starship", "Falcon 1"]
+SPACEX_LAUNCHPADS = [
+    ("CCSFS SLC 40", "Cape Canaveral Space Force Station Space Launch Complex 40", "Cape Canaveral", "Florida"),
+    ("KSC LC 39A", "Kennedy Space Center Historic Launch Complex 39A", "Cape Canaveral", "Florida"),
+    ("VAFB SLC 4E", "Vandenberg Space Force Base Space Launch Complex 4E", "Vandenberg", "California"),
+    ("STLS", "SpaceX South Texas Launch Site", "Boca Chica Village", "Texas"),
+    ("Kwajalein Atoll", "Kwajalein Atoll Omelek Island", "Omelek Island", "Marshall Islands"),
+    ("VAFB SLC 3W", "Vandenberg Space Force Base Space Launch Complex 3W", "Vandenberg", "California"),
+]
+SPECTRAL_TYPES = ["G2 V", "K1 V", "M3 V", "F8 V", "K5 V", ""]
+EXOPLANET_COLUMNS = [
+    'pl_name', 'hostname', 'discoverymethod', 'disc_year', 'pl_orbper', 'pl_orbsmax',
+    'pl_rade', 'pl_masse', 'pl_orbeccen', 'pl_eqt', 'pl_insol', 'st_spectype',
+    'st_teff', 'st_rad', 'st_mass', 'st_lum', 'sy_dist', 'rowupdate',
+]
+
+ADQL = re.compile(
+    r"select\s+(?:top\s+(\d+)\s+)?(.+?)\s+from\s+\w+(?:\s+where\s+(.+?))?(?:\s+order\s+by\s+(.+))?$",
+    re.I | re.S
+)
+COMPARISON = re.compile(r"(\w+)\s*(>=|<=|>|<|=)\s*('(?:[^']|'')*'|[-+\d.eE]+)$")
+MEMBERSHIP = re.compile(r"(\w+)\s+in\s+\((.*)\)$", re.I)
+COMPARATORS = {
+    '>=': lambda a, b: a >= b,
+    '<=': lambda a, b: a <= b,
+    '>': lambda a, b: a > b,
+    '<': lambda a, b: a < b,
+    '=': lambda a, b: a == b,
+}
+
+
+def _literal(text):
+    text = text.strip()
+    if text.startswith("'"):
+        return text[1:-1].replace("''", "'")
+    return float(text)
+
+
+def _filter_rows(rows, condition):
+    """Rows passing one ADQL condition; empty (NULL) values never pass"""
+    if not condition or condition.lower() == 'default_flag = 1':
+        return rows
+    membership = MEMBERSHIP.match(condition)
+    if membership:
+        index = EXOPLANET_COLUMNS.index(membership.group(1))
+        values = {_literal(v) for v in re.findall(r"'(?:[^']|'')*'|[-+\d.eE]+", membership.group(2))}
+        return [row for row in rows if row[index] != '' and row[index] in values]
+    column, op, value = COMPARISON.match(condition).groups()
+    index = EXOPLANET_COLUMNS.index(column)
+    value = _literal(value)
+    compare = COMPARATORS[op]
+    return [row for row in rows if row[index] != '' and compare(row[index], value)]
+
+
+class SyntheticData:
+    """Deterministic synthetic payloads shaped like the real upstream responses"""
+
+    def __init__(self, launches=100, exoplanets=1000, neos=140, seed=0):
+        self.neos_per_week = neos
+        self.seed = seed
+        self._images = {}
+        rng = random.Random(seed)
+        self.launches = json.dumps(self._launches(rng, launches)).encode()
+        self.exoplanet_rows = self._exoplanets(rng, exoplanets)
+
+    def _launches(self, rng, count):
+        now = datetime.utcnow()
+        return [{
+            'id': f"launch-{i}",
+            'name': f"{rng.choice(ORGANIZATIONS)} Mission {i}",
+            'date_utc': (now + timedelta(minutes=rng.randrange(0, 10 * 365 * 24 * 60))).strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+            'details': rng.choice([None, f"Payload delivery for mission {i}."]),
+            'rocket': f"rocket-{i % 4}",
+            'launchpad': f"launchpad-{i % 6}",
+            'payloads': [f"payload-{i}"],
+        } for i in range(count)]
+
+    def _exoplanets(self, rng, count):
+        rows = []
+        for i in range(count):
+            teff = rng.uniform(2500, 9000)
+            rows.append([
+                f"SYN-{i:06d} b", f"SYN-{i // 3:06d}", rng.choice(["Transit", "Radial Velocity", "Imaging"]),
+                rng.randrange(1995, 2025), round(rng.lognormvariate(3, 1.5), 4), round(rng.lognormvariate(-2, 1.2), 5),
+                round(rng.lognormvariate(0.8, 0.7), 3), round(rng.lognormvariate(2, 1.5), 3), round(rng.random() * 0.5, 3),
+                "", "", rng.choice(SPECTRAL_TYPES), round(teff), round(rng.uniform(0.1, 3), 3), round(rng.uniform(0.1, 2.5), 3),
+                "", round(rng.uniform(1, 3000), 2), f"2024-{rng.randrange(1, 13):02d}-{rng.randrange(1, 29):02d}",
+            ])
+        rows.sort(key=lambda row: row[0])
+        return rows
+
+    def spacex_entity(self, collection, entity_id):
+        """The rocket, launchpad or payload with entity_id, or None if the ID is not one of ours"""
+        prefix, _, number = entity_id.rpartition('-')
+        if prefix != collection[:-1] or not number.isdigit():
+            return None
+        i = int(number)
+        if collection == 'rockets':
+            return {'id': entity_id, 'name': SPACEX_ROCKETS[i % len(SPACEX_ROCKETS)]}
+        if collection == 'launchpads':
+            name, full_name, locality, region = SPACEX_LAUNCHPADS[i % len(SPACEX_LAUNCHPADS)]
+            return {'id': entity_id, 'name': name, 'full_name': full_name, 'locality': locality, 'region': region}
+        rng = random.Random(self.seed + i)
+        return {
+            'id': entity_id,
+            'name': f"Payload {i}",
+            'type': rng.choice(['Satellite', 'Crew Dragon', 'Dragon 2.0']),
+            'orbit': rng.choice(['LEO', 'GTO', 'SSO', 'ISS']),
+            'mass_kg': round(rng.uniform(100, 15000)),
+            'customers': [rng.choice(ORGANIZATIONS)],
+        }
+
+    def apod(self, day, base_url):
+        """The picture for one day; some days have none and some are videos"""
+        if day.toordinal() % 17 == 0:
+            return None
+        picture = {
+            'date': day.isoformat(), 'title': f"Synthetic APOD {day.isoformat()}",
+            'explanation': 'Benchmark fixture.', 'media_type': 'image',
+            'url': f"{base_url}/images/apod-{day.isoformat()}.jpg",
+            'hdurl': f"{base_url}/images/apod-{day.isoformat()}-hd.jpg",
+        }
+        if day.toordinal() % 7 == 0:
+            picture.update(media_type='video', url='https://www.youtube.com/embed/synthetic',
+                           thumbnail_url=f"{base_url}/images/apod-{day.isoformat()}.jpg")
+            del picture['hdurl']
+        return picture
+
+    def image(self, name):
+        """A synthetic JPEG about the size of a typical APOD image"""
+        if name not in self._images:
+            from PIL import Image
+            seed = sum(name.encode())
+            image = Image.radial_gradient('L').resize((1600, 1200)).convert('RGB')
+            image.paste((seed % 256, seed * 7 % 256, seed * 13 % 256), (0, 0, 400, 300))
+            buffer = io.BytesIO()
+            image.save(buffer, 'JPEG', quality=90)
+            self._images[name] = buffer.getvalue()
+        return self._images[name]
+
+    def neo_day(self, day):
+        """NEOs approaching on one day; ids are unique per day"""
+        rng = random.Random(f"{self.seed}-{day}")
+        per_day = max(1, self.neos_per_week // 7)
+        epoch = int(datetime.combine(day, datetime.min.time()).timestamp() * 1000)
+        diameters = [rng.lognormvariate(-2.5, 1.2) for _ in range(per_day)]
+        return [{
+            'id': f"{day:%Y%m%d}{i:05d}",
+            'name': f"({day.year} {chr(65 + i % 26)}{chr(65 + i // 26 % 26)}{i})",
+            'is_potentially_hazardous_asteroid': rng.random() < 0.1,
+            'absolute_magnitude_h': round(rng.uniform(15, 30), 2),
+            'estimated_diameter': {'kilometers': {
+                'estimated_diameter_min': diameters[i],
+                'estimated_diameter_max': diameters[i] * 2.2,
+            }},
+            'close_approach_data': [{
+                'close_approach_date': day.isoformat(),
+                'close_approach_date_full': f"{day:%Y-%b-%d} {rng.randrange(24):02d}:{rng.randrange(60):02d}",
+                'epoch_date_close_approach': epoch + rng.randrange(86400) * 1000,
+                'relative_velocity': {'kilometers_per_hour': str(rng.uniform(5000, 150000))},
+                'miss_distance': {'kilometers': str(rng.uniform(1e5, 7.5e7))},
+                'orbiting_body': 'Earth',
+            }],
+        } for i in range(per_day)]
+
+
+class ReplayHandler(BaseHTTPRequestHandler):
+    server_version = "SpaceReplay/1.0"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        server = self.server
+        server.count(url.path)
+
+        if server.latency:
+            time.sleep(server.latency * (1 + server.rng.uniform(-server.jitter, server.jitter)))
+        if server.error_rate and server.rng.random() < server.error_rate:
+            return self._send(b'{"error": "injected"}', status=503)
+        # NASA endpoints are metered per api_key, like api.nasa.gov
+        self.rate_limit = None
+        if 'api_key' in query:
+            self.rate_limit = server.spend(query['api_key'][0])
+            if self.rate_limit[1] < 0:
+                return self._send(b'{"error": {"code": "OVER_RATE_LIMIT"}}', status=429)
+
+        recorded = server.fixture(url.path)
+        if recorded is not None:
+            return self._send(recorded)
+
+        if url.path.endswith('/launches/upcoming'):
+            return self._send(server.data.launches)
+        if url.path.endswith('/iss-now.json'):
+            now = time.time()
+            return self._send(json.dumps({
+                'message': 'success',
+                'timestamp': int(now),
+                'iss_position': {
+                    'latitude': f"{51.6 * math.sin(now / ORBIT_SECONDS * 2 * math.pi):.4f}",
+                    'longitude': f"{((now / ORBIT_SECONDS * 360) % 360) - 180:.4f}",
+                },
+            }).encode())
+        if url.path.endswith('/neo/rest/v1/feed'):
+            start = date.fromisoformat(query['start_date'][0])
+            end = date.fromisoformat(query.get('end_date', query['start_date'])[0])
+            days = {}
+            day = start
+            while day <= end:
+                days[day.isoformat()] = server.data.neo_day(day)
+                day += timedelta(days=1)
+            return self._send(json.dumps({
+                'element_count': sum(len(v) for v in days.values()),
+                'near_earth_objects': days,
+            }).encode())
+        if url.path.endswith('/planetary/apod'):
+            if 'start_date' in query:
+                start = date.fromisoformat(query['start_date'][0])
+                end = date.fromisoformat(query.get('end_date', [date.today().isoformat()])[0])
+                pictures = []
+                day = start
+                while day <= end:
+                    picture = server.data.apod(day, server.base_url)
+                    if picture is not None:
+                        pictures.append(picture)
+                    day += timedelta(days=1)
+                return self._send(json.dumps(pictures).encode())
+            day = date.fromisoformat(query.get('date', [date.today().isoformat()])[0])
+            return self._send(json.dumps(server.data.apod(day, server.base_url)).encode())
+        if url.path.startswith('/images/'):
+            return self._send(server.data.image(url.path.rsplit('/', 1)[-1]), content_type='image/jpeg')
+        if url.path.endswith('/TAP/sync'):
+            return self._tap(query)
+        return self._send(b'{"error": "not found"}', status=404)
+
+    def do_POST(self):
+        # SpaceX v4 /<collection>/query: {"query": {"_id": {"$in": [...]}}, "options": {"select": [...]}}
+        url = urlparse(self.path)
+        server = self.server
+        server.count(url.path)
+        self.rate_limit = None
+        body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+
+        if server.latency:
+            time.sleep(server.latency * (1 + server.rng.uniform(-server.jitter, server.jitter)))
+        if server.error_rate and server.rng.random() < server.error_rate:
+            return self._send(b'{"error": "injected"}', status=503)
+
+        collection = url.path.rstrip('/').split('/')[-2] if url.path.endswith('/query') else None
+        if collection not in ('rockets', 'launchpads', 'payloads'):
+            return self._send(b'{"error": "not found"}', status=404)
+        ids = body.get('query', {}).get('_id', {}).get('$in', [])
+        select = body.get('options', {}).get('select')
+        docs = []
+        for entity_id in ids:
+            entity = server.data.spacex_entity(collection, entity_id)
+            if entity is not None:
+                docs.append({k: v for k, v in entity.items() if not select or k in select})
+        return self._send(json.dumps({'docs': docs, 'totalDocs': len(docs)}).encode())
+
+    def _tap(self, query):
+        # Supports the subset of ADQL the app sends: TOP n, a column list,
+        # and-ed comparisons and IN lists, and ORDER BY column [dir], pl_name
+        adql = query.get('query', [''])[0]
+        match = ADQL.match(adql.strip())
+        if match is None:
+            return self._send(b'{"error": "unsupported query"}', status=400)
+        top, selected, where, order = match.groups()
+        rows = self.server.data.exoplanet_rows
+        for condition in re.split(r'\s+and\s+', where or '', flags=re.I):
+            rows = _filter_rows(rows, condition.strip())
+        if order:
+            column, _, direction = order.split(',')[0].strip().partition(' ')
+            index = EXOPLANET_COLUMNS.index(column)
+            present = [row for row in rows if row[index] != '']
+            present.sort(key=lambda row: row[0])
+            present.sort(key=lambda row: row[index], reverse=direction.strip().lower() == 'desc')
+            rows = present + [row for row in rows if row[index] == '']
+        rows = rows[:int(top)] if top else rows
+
+        columns = [c.strip() for c in selected.split(',')] if selected.strip() != '*' else EXOPLANET_COLUMNS
+        indexes = [EXOPLANET_COLUMNS.index(c) for c in columns]
+        rows = [[row[i] for i in indexes] for row in rows]
+        if query.get('format', ['json'])[0] == 'csv':
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(columns)
+            writer.writerows(rows)
+            return self._send(buffer.getvalue().encode(), content_type='text/csv')
+        return self._send(json.dumps([dict(zip(columns, row)) for row in rows]).encode())
+
+    def _send(self, body, status=200, content_type='application/json'):
+        # Strong ETag over the uncompressed body so unchanged payloads revalidate
+        etag = f'"{hashlib.md5(body).hexdigest()}"' if status == 200 else None
+        if etag is not None and self.headers.get('If-None-Match') == etag:
+            status, body = 304, b''
+        if 'gzip' in self.headers.get('Accept-Encoding', '') and body:
+            body = gzip.compress(body, compresslevel=1)
+            encoding = 'gzip'
+        else:
+            encoding = None
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        if encoding:
+            self.send_header('Content-Encoding', encoding)
+        if etag is not None:
+            self.send_header('ETag', etag)
+        if getattr(self, 'rate_limit', None) is not None:
+            limit, remaining = self.rate_limit
+            self.send_header('X-RateLimit-Limit', str(limit))
+            self.send_header('X-RateLimit-Remaining', str(max(remaining, 0)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class ReplayServer(ThreadingHTTPServer):
+    """Threaded replay server; counts requests per path"""
+
+    daemon_threads = True
+
+    def __init__(self, data, host='127.0.0.1', port=0, latency=0.0, jitter=0.0, error_rate=0.0, fixtures_dir=None,
+                 rate_limit=1000):
+        super().__init__((host, port), ReplayHandler)
+        self.rate_limit = rate_limit
+        self.spent = {}
+        self.data = data
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.fixtures_dir = Path(fixtures_dir) if fixtures_dir else None
+        self.rng = random.Random(1)
+        self.requests = {}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def base_url(self):
+        return f"http://{self.server_address[0]}:{self.server_address[1]}"
+
+    def env(self):
+        """Environment variables that point SpaceAPI at this server"""
+        return {
+            'SPACEX_API_URL': f"{self.base_url}/v4",
+            'NASA_API_URL': self.base_url,
+            'OPEN_NOTIFY_API_URL': self.base_url,
+            'EXOPLANET_API_URL': f"{self.base_url}/TAP/sync",
+        }
+
+    def count(self, path):
+        with self._lock:
+            self.requests[path] = self.requests.get(path, 0) + 1
+
+    def spend(self, api_key):
+        """Charge one request to api_key and return (limit, remaining)"""
+        with self._lock:
+            self.spent[api_key] = self.spent.get(api_key, 0) + 1
+            return self.rate_limit, self.rate_limit - self.spent[api_key]
+
+    def fixture(self, path):
+        if self.fixtures_dir is None:
+            return None
+        candidate = self.fixtures_dir / (path.strip('/').replace('/', '_') + ('' if path.endswith('.json') else '.json'))
+        return candidate.read_bytes() if candidate.is_file() else None
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, name='replay-server', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+def add_server_arguments(parser):
+    parser.add_argument('--launches', type=int, default=10000, help="synthetic upcoming launches")
+    parser.add_argument('--exoplanets', type=int, default=30000, help="synthetic catalog rows")
+    parser.add_argument('--neos', type=int, default=5000, help="synthetic NEOs per 7-day feed window")
+    parser.add_argument('--latency', type=float, default=0.0, help="added seconds per response")
+    parser.add_argument('--jitter', type=float, default=0.0, help="latency jitter as a fraction (0-1)")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="fraction of responses that fail with 503")
+    parser.add_argument('--fixtures', default=None, help="directory of recorded fixtures to replay")
+    parser.add_argument('--rate-limit', type=int, default=1000, help="requests per api_key before 429s")
+
+
+def server_from_args(args, port=0):
+    data = SyntheticData(launches=args.launches, exoplanets=args.exoplanets, neos=args.neos)
+    return ReplayServer(
+        data,
+        port=port,
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        fixtures_dir=args.fixtures,
+        rate_limit=args.rate_limit
+    )
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--port', type=int, default=8765)
+    add_server_arguments(parser)
+    args = parser.parse_args()
+    server = server_from_args(args, port=args.port)
+    print(f"Replay server on {server.base_url}")
+    for key, value in server.env().items():
+        print(f"  {key}={value}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
@@ -0,0 +1,109 @@
+import streamlit as st
+from datetime import date, timedelta
+from api.space_data import SpaceAPI, APOD_GALLERY_DAYS
+from utils import metrics
+
+# The first Astronomy Picture of the Day
+APOD_FIRST_DAY = date(1995, 6, 16)
+MAX_RANGE_DAYS = 366
+
+GALLERY_COLUMNS = 4
+# Thumbnails are fetched and sent to the browser one batch at a time, as the
+# visitor asks for more
+THUMBS_PER_BATCH = 12
+
+def _image_source(picture):
+    """URL of a still for the picture: the image itself, or a video's thumbnail"""
+    if picture.get('media_type') == 'image':
+        return picture.get('url')
+    return picture.get('thumbnail_url')
+
+def _select(picture_date):
+    st.session_state['apod_selected'] = picture_date
+
+def _show_more():
+    st.session_state['apod_shown'] += THUMBS_PER_BATCH
+
+def show_selected(space_api, picture):
+    """Medium-size image, title and explanation for one picture"""
+    st.subheader(f"{picture.get('title', 'Untitled')} ({picture['date']})")
+    source = _image_source(picture)
+    if source:
+        path = space_api.get_images([source], 'medium')[source]
+        if path is not None:
+            st.image(str(path), use_column_width=True)
+    original = picture.get('hdurl') or picture.get('url')
+    if picture.get('media_type') != 'image' and picture.get('url'):
+        st.markdown(f"🎬 [Watch the video]({picture['url']})")
+    elif original:
+        st.markdown(f"[Full resolution]({original})")
+    if picture.get('copyright'):
+        st.caption(f"© {picture['copyright'].strip()}")
+    st.write(picture.get('explanation', ''))
+    st.button("Close", on_click=_select, args=(None,), key="apod_close")
+    st.markdown("---")
+
+@st.fragment
+@metrics.timed('page_script_seconds', page='Astronomy Pictures (fragment)')
+def show_gallery_grid(space_api, pictures):
+    """Selected picture and thumbnail grid; viewing a picture or loading more reruns only this"""
+    selected = st.session_state.get('apod_selected')
+    for picture in pictures:
+        if picture['date'] == selected:
+            show_selected(space_api, picture)
+            break
+
+    shown = pictures[:st.session_state['apod_shown']]
+    sources = [_image_source(picture) for picture in shown]
+    thumbnails = space_api.get_images([source for source in sources if source], 'thumb')
+
+    for row in range(0, len(shown), GALLERY_COLUMNS):
+        columns = st.columns(GALLERY_COLUMNS)
+        for column, picture, source in zip(columns, shown[row:row + GALLERY_COLUMNS], sources[row:row + GALLERY_COLUMNS]):
+            with column:
+                path = thumbnails.get(source) if source else None
+                if path is not None:
+                    st.image(str(path), use_column_width=True)
+                else:
+                    st.write("🖼️ No preview")
+                st.caption(f"{picture['date']} · {picture.get('title', 'Untitled')}")
+                st.button("View", on_click=_select, args=(picture['date'],), key=f"apod_view_{picture['date']}")
+
+    st.caption(f"Showing {len(shown)} of {len(pictures)} pictures")
+    if len(shown) < len(pictures):
+        st.button("Load more", on_click=_show_more, key="apod_more")
+
+def show_apod_gallery():
+    st.header("🔭 Astronomy Picture of the Day")
+    space_api = SpaceAPI()
+
+    today = date.today()
+    st.sidebar.subheader("Gallery Dates")
+    dates = st.sidebar.date_input(
+        "Date range",
+        (today - timedelta(days=APOD_GALLERY_DAYS - 1), today),
+        min_value=APOD_FIRST_DAY,
+        max_value=today,
+        key="apod_dates"
+    )
+    if len(dates) != 2:
+        st.info("Pick an end date for the gallery.")
+        return
+    start_date, end_date = dates
+    if (end_date - start_date).days >= MAX_RANGE_DAYS:
+        start_date = end_date - timedelta(days=MAX_RANGE_DAYS - 1)
+        st.warning(f"Showing the last {MAX_RANGE_DAYS} days of the selected range.")
+
+    # One request for every day not cached yet; past days are kept forever
+    pictures = space_api.get_apod_gallery(start_date, end_date)
+    if not pictures:
+        st.info("No pictures in this date range.")
+        return
+
+    # A new range starts again from the first batch
+    if st.session_state.get('apod_range') != (start_date, end_date):
+        st.session_state['apod_range'] = (start_date, end_date)
+        st.session_state['apod_shown'] = THUMBS_PER_BATCH
+        st.session_state['apod_selected'] = None
+
+    show_gallery_grid(space_api, pictures)
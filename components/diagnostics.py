@@ -0,0 +1,87 @@
+import streamlit as st
+import pandas as pd
+from datetime import datetime
+from api.space_data import rate_limits, refresh_schedule
+from utils import metrics
+
+# Hidden page, reached with ?diagnostics=1
+def show_diagnostics():
+    st.header("🔧 Diagnostics")
+    st.caption("Process-wide since start-up; shared by every session.")
+
+    counters = metrics.registry.counters()
+    histograms = metrics.registry.histograms()
+
+    # Cache effectiveness per endpoint
+    st.subheader("Response Cache")
+    cache = pd.DataFrame(
+        [{'endpoint': labels['endpoint'], 'result': labels['result'], 'count': value}
+         for name, labels, value in counters if name == 'spaceapi_cache_requests_total'],
+        columns=['endpoint', 'result', 'count']
+    )
+    if cache.empty:
+        st.write("No cache lookups yet.")
+    else:
+        table = cache.pivot_table(index='endpoint', columns='result', values='count', fill_value=0, aggfunc='sum')
+        served = table.drop(columns=[c for c in ('miss', 'error') if c in table.columns]).sum(axis=1)
+        table['hit ratio'] = (served / table.sum(axis=1)).round(3)
+        st.dataframe(table, use_container_width=True)
+
+    # Upstream requests, retries and latency
+    st.subheader("Upstream Requests")
+    requests_df = pd.DataFrame(
+        [{'metric': name, **labels, 'count': value}
+         for name, labels, value in counters
+         if name in ('spaceapi_requests_total', 'spaceapi_retries_total', 'spaceapi_coalesced_requests_total')]
+    )
+    if requests_df.empty:
+        st.write("No upstream requests yet.")
+    else:
+        st.dataframe(requests_df, use_container_width=True, hide_index=True)
+
+    # Rate-limit quotas and how far refreshes are being stretched to save them
+    st.subheader("Rate Limits")
+    quotas = rate_limits()
+    if quotas:
+        st.dataframe(
+            pd.DataFrame(
+                [{'quota': quota, 'limit': limit, 'remaining': remaining,
+                  'observed': datetime.fromtimestamp(observed_at).strftime('%H:%M:%S')}
+                 for quota, limit, remaining, observed_at in quotas]
+            ),
+            use_container_width=True,
+            hide_index=True
+        )
+    else:
+        st.write("No rate-limit headers seen yet.")
+    st.dataframe(
+        pd.DataFrame(
+            [{'endpoint': endpoint, 'priority': priority, 'stretch': stretch, 'ttl s': policy.ttl, 'stale s': policy.stale}
+             for endpoint, priority, stretch, policy in refresh_schedule()]
+        ),
+        use_container_width=True,
+        hide_index=True
+    )
+
+    # Latency, payload size, script and figure timings
+    st.subheader("Timings and Payload Sizes")
+    summary = pd.DataFrame(
+        [{'metric': name, 'labels': ", ".join(f"{k}={v}" for k, v in labels.items()), **values}
+         for name, labels, values in histograms]
+    )
+    if summary.empty:
+        st.write("Nothing recorded yet.")
+    else:
+        st.dataframe(summary, use_container_width=True, hide_index=True)
+
+    # Raw export for scraping or attaching to bug reports
+    st.subheader("Prometheus Export")
+    exposition = metrics.registry.render_prometheus()
+    st.download_button(
+        "Download metrics",
+        exposition,
+        file_name="space_tracker_metrics.prom",
+        mime="text/plain"
+    )
+    with st.expander("Show text"):
+        st.code(exposition, language="text")
@@ -1,103 +1,258 @@
+import numpy as np
 import streamlit as st
 import plotly.express as px
-import pandas as pd
+import plotly.graph_objects as go
 from api.space_data import SpaceAPI
-from utils.helpers import calculate_distance_au_to_ly, format_number
+from api.exoplanet_query import Filter, make_query
+from components.paginated_table import show_paginated_table
+from components.stages import stage
+from utils.density import bin_points
+from utils import metrics
 
-def show_exoplanet_explorer():
+# Columns shown in the details table: catalog column -> label
+DETAIL_COLUMNS = {
+    'pl_name': 'Planet',
+    'hostname': 'Host Star',
+    'disc_year': 'Discovered',
+    'pl_orbsmax': 'Distance from Star (AU)',
+    'pl_orbper': 'Orbital Period (days)',
+    'pl_rade': 'Radius (Earth radii)',
+    'pl_masse': 'Mass (Earth masses)',
+    'st_spectype': 'Star Type',
+    'eq_temp': 'Equilibrium Temperature (K)',
+    'esi': 'Earth Similarity Index',
+    'in_hz': 'Potentially Habitable',
+}
+
+# Extra columns the scatter plot needs
+PLOT_COLUMNS = ['pl_orbsmax', 'pl_rade', 'pl_orbper', 'pl_masse']
+PLOT_LABELS = {
+    'pl_orbsmax': 'Distance from Star (AU)',
+    'pl_rade': 'Planet Radius (Earth Radii)',
+    'pl_orbper': 'Orbital Period (days)',
+    'pl_masse': 'Planet Mass (Earth Mass)'
+}
+
+# Above WEBGL_THRESHOLD points the scatter is drawn with WebGL; above
+# POINTS_LIMIT it becomes a DENSITY_BINS x DENSITY_BINS density map, so the
+# figure sent to the browser stays bounded however large the catalog is
+WEBGL_THRESHOLD = 1000
+POINTS_LIMIT = 10000
+DENSITY_BINS = 100
+
+# Columns shown for similar planets: the compared features and the distance
+SIMILAR_COLUMNS = {
+    'pl_name': 'Planet',
+    'hostname': 'Host Star',
+    'pl_rade': 'Radius (Earth radii)',
+    'pl_masse': 'Mass (Earth masses)',
+    'pl_orbper': 'Orbital Period (days)',
+    'pl_orbsmax': 'Distance from Star (AU)',
+    'st_teff': 'Star Temperature (K)',
+    'distance': 'Difference (lower is more alike)',
+}
+SIMILAR_PLANETS = 10
+
+@st.cache_data(max_entries=32, show_spinner=False)
+@metrics.timed('figure_build_seconds', figure='exoplanet_scatter')
+def build_exoplanet_scatter(points, log_x, log_y):
+    """Build the scatter figure spec for a frame of PLOT_COLUMNS plus pl_name.
+
+    Cached on the frame and axis types, so reruns with an unchanged filter
+    reuse it.
+    """
+    fig = px.scatter(
+        points,
+        x='pl_orbsmax',
+        y='pl_rade',
+        hover_name='pl_name',
+        hover_data=['pl_orbper', 'pl_masse'],
+        title='Exoplanet Distribution',
+        labels=PLOT_LABELS,
+        log_x=log_x,
+        log_y=log_y,
+        render_mode='webgl' if len(points) > WEBGL_THRESHOLD else 'svg'
+    )
+    return fig.to_dict()
+
+@st.cache_data(max_entries=32, show_spinner=False)
+@metrics.timed('figure_build_seconds', figure='exoplanet_density')
+def build_exoplanet_density(distances, radii, distance_range, radius_range, log_x, log_y):
+    """Build a density map figure spec of planets binned by distance and radius.
+
+    Binning runs over the slider ranges, so narrowing them zooms in at the
+    same number of cells. Cached on the coordinates, ranges and axis types.
+    """
+    x_edges, y_edges, counts = bin_points(
+        distances, radii, distance_range, radius_range, DENSITY_BINS, log_x, log_y
+    )
+    # Colour on a log scale so sparse regions stay visible next to dense ones
+    with np.errstate(divide='ignore'):
+        shade = np.round(np.where(counts > 0, np.log10(counts), np.nan), 3)
+    decades = range(int(np.log10(counts.max(initial=1))) + 1)
+    fig = go.Figure(go.Heatmap(
+        x=x_edges,
+        y=y_edges,
+        z=shade,
+        customdata=counts,
+        colorscale='Viridis',
+        colorbar=dict(
+            title='Planets',
+            tickvals=list(decades),
+            ticktext=[f"{10 ** i:,}" for i in decades]
+        ),
+        hovertemplate='%{customdata:,.0f} planets<extra></extra>'
+    ))
+    fig.update_layout(
+        title='Exoplanet Density',
+        xaxis_title=PLOT_LABELS['pl_orbsmax'],
+        yaxis_title=PLOT_LABELS['pl_rade'],
+        xaxis_type='log' if log_x else 'linear',
+        yaxis_type='log' if log_y else 'linear'
+    )
+    return fig.to_dict()
+
+def build_figure(filtered_df, distance_range, radius_range, log_x, log_y):
+    """Scatter of individual planets while they fit, else their density over the slider ranges"""
+    if len(filtered_df) <= POINTS_LIMIT:
+        return build_exoplanet_scatter(filtered_df[['pl_name'] + PLOT_COLUMNS], log_x, log_y)
+    return build_exoplanet_density(
+        filtered_df['pl_orbsmax'].to_numpy(dtype='float32', na_value=np.nan),
+        filtered_df['pl_rade'].to_numpy(dtype='float32', na_value=np.nan),
+        distance_range,
+        radius_range,
+        log_x,
+        log_y
+    )
+
+@st.fragment
+@metrics.timed('page_script_seconds', page='Exoplanet Explorer (fragment)')
+def show_exoplanet_results(max_distance, max_radius, earth_like):
+    """Filters, chart, details and similar planets; a filter change reruns only this.
+
+    earth_like is the full run's planets most like Earth, or None if it had none.
+    """
     space_api = SpaceAPI()
     
-    # Fetch exoplanet data
-    exoplanets = space_api.get_exoplanets()
+    st.subheader("Filter Exoplanets")
+    col1, col2 = st.columns(2)
     
-    if not exoplanets:
+    with col1:
+        # Distance filter
+        distance_range = st.slider(
+            "Distance from Star (AU)",
+            0.0,
+            max_distance,
+            (0.0, max_distance),
+            key="exoplanet_distance"
+        )
+        
+        # Planet size filter
+        radius_range = st.slider(
+            "Planet Radius (Earth Radii)",
+            0.0,
+            max_radius,
+            (0.0, max_radius),
+            key="exoplanet_radius"
+        )
+    
+    with col2:
+        log_x = st.checkbox("Log scale distance axis", key="exoplanet_log_x")
+        log_y = st.checkbox("Log scale radius axis", key="exoplanet_log_y")
+        
+        # Habitability filter and ordering use the precomputed metric columns
+        habitable_only = st.checkbox("Potentially habitable only", key="exoplanet_habitable")
+        sort_by = st.selectbox(
+            "Sort By",
+            ["Newest Discoveries", "Earth Similarity Index"],
+            key="exoplanet_sort"
+        )
+    
+    # The filters become one query; a repeat is answered with the same frame
+    # and narrowing a slider from the previous, wider result
+    filters = [
+        Filter('pl_orbsmax', '>=', distance_range[0]),
+        Filter('pl_orbsmax', '<=', distance_range[1]),
+        Filter('pl_rade', '>=', radius_range[0]),
+        Filter('pl_rade', '<=', radius_range[1]),
+    ]
+    if habitable_only:
+        filters.append(Filter('in_hz', '=', True))
+    filtered_df = space_api.get_exoplanets(make_query(
+        filters,
+        columns=list(DETAIL_COLUMNS) + PLOT_COLUMNS,
+        order_by='esi' if sort_by == "Earth Similarity Index" else 'disc_year',
+        descending=True
+    ))
+    if filtered_df is None:
         st.error("Unable to fetch exoplanet data. Please try again later.")
         return
     
-    # Convert to DataFrame for easier manipulation
-    df = pd.DataFrame(exoplanets)
-    
-    # Sidebar filters
-    st.sidebar.subheader("Filter Exoplanets")
+    # Main content
+    st.subheader("Recently Discovered Exoplanets")
     
-    # Distance filter
-    max_distance = float(df['pl_orbsmax'].max())
-    distance_range = st.sidebar.slider(
-        "Distance from Star (AU)",
-        0.0,
-        max_distance,
-        (0.0, max_distance)
-    )
+    # Visualization; narrowing the sliders zooms in. The figure and details
+    # stages rerun only when the filtered frame or the axes change, not when
+    # the details table is paged or a planet is picked
+    fig = stage('exoplanet_figure', build_figure, filtered_df, distance_range, radius_range, log_x, log_y)
+    if len(filtered_df) > POINTS_LIMIT:
+        st.caption(
+            f"Showing the density of {len(filtered_df):,} planets. Narrow the distance and "
+            f"radius ranges to {POINTS_LIMIT:,} planets or fewer to see individual planets."
+        )
+    st.plotly_chart(fig, use_container_width=True)
     
-    # Planet size filter
-    max_radius = float(df['pl_rade'].max())
-    radius_range = st.sidebar.slider(
-        "Planet Radius (Earth Radii)",
-        0.0,
-        max_radius,
-        (0.0, max_radius)
-    )
+    # Detailed list
+    st.subheader("Exoplanet Details")
     
-    # Apply filters
-    mask = (
-        (df['pl_orbsmax'] >= distance_range[0]) &
-        (df['pl_orbsmax'] <= distance_range[1]) &
-        (df['pl_rade'] >= radius_range[0]) &
-        (df['pl_rade'] <= radius_range[1])
+    # One paged table instead of an expander per planet; only the visible
+    # page is sent to the browser
+    details = stage('exoplanet_details', lambda df: df[list(DETAIL_COLUMNS)].rename(columns=DETAIL_COLUMNS), filtered_df)
+    show_paginated_table(
+        details,
+        key="exoplanet_details",
+        search_column="Planet",
+        default_sort="Earth Similarity Index" if sort_by == "Earth Similarity Index" else "Discovered",
+        descending=True,
+        selectable=True
     )
-    filtered_df = df[mask]
     
-    # Main content
-    st.subheader("Recently Discovered Exoplanets")
+    # Nearest neighbours of the clicked planet (or Earth) over the whole catalog
+    st.subheader("Similar Planets")
+    selected = st.session_state.get("exoplanet_details_selected")
+    name = filtered_df.loc[selected, 'pl_name'] if selected in filtered_df.index else None
+    if name is None and earth_like is not None:
+        similar = earth_like
+    else:
+        similar = space_api.get_similar_planets(name, SIMILAR_PLANETS)
+    if similar is None:
+        st.info("Similar planets will be listed once the catalog has finished downloading.")
+    elif similar.empty:
+        st.caption(f"{name} is missing its radius, mass, orbit or star temperature, so it can't be compared.")
+    else:
+        st.caption(
+            f"Planets most like {name or 'Earth'} in radius, mass, orbital period, distance from "
+            "star and star temperature. Click a planet in the table above to compare with it."
+        )
+        st.dataframe(
+            similar[list(SIMILAR_COLUMNS)].rename(columns=SIMILAR_COLUMNS),
+            use_container_width=True,
+            hide_index=True
+        )
+
+def show_exoplanet_explorer():
+    space_api = SpaceAPI()
     
-    # Visualization
-    fig = px.scatter(
-        filtered_df,
-        x='pl_orbsmax',
-        y='pl_rade',
-        hover_name='pl_name',
-        hover_data=['pl_orbper', 'pl_masse'],
-        title='Exoplanet Distribution',
-        labels={
-            'pl_orbsmax': 'Distance from Star (AU)',
-            'pl_rade': 'Planet Radius (Earth Radii)',
-            'pl_orbper': 'Orbital Period (days)',
-            'pl_masse': 'Planet Mass (Earth Mass)'
-        }
+    # Slider bounds come from a two-column projection of the whole catalog;
+    # the planets most like Earth (the Similar Planets default) load alongside
+    loaded = space_api.fetch_many(
+        ('exoplanets', make_query(columns=['pl_orbsmax', 'pl_rade'])),
+        ('similar_planets', None, SIMILAR_PLANETS)
     )
-    st.plotly_chart(fig, use_container_width=True)
+    bounds = loaded['exoplanets']
     
-    # Detailed list
-    st.subheader("Exoplanet Details")
+    if bounds is None or bounds.empty:
+        st.error("Unable to fetch exoplanet data. Please try again later.")
+        return
     
-    for _, planet in filtered_df.iterrows():
-        with st.expander(f"{planet['pl_name']}"):
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                st.write("**Distance from Star:**", 
-                        f"{format_number(planet['pl_orbsmax'])} AU")
-                st.write("**Orbital Period:**", 
-                        f"{format_number(planet['pl_orbper'])} days")
-                st.write("**Planet Radius:**", 
-                        f"{format_number(planet['pl_rade'])} Earth radii")
-            
-            with col2:
-                st.write("**Planet Mass:**", 
-                        f"{format_number(planet['pl_masse'])} Earth masses")
-                st.write("**Star Type:**", 
-                        planet.get('st_spectype', 'Unknown'))
-                
-                # Calculate if planet is in habitable zone (simplified)
-                # This is a very basic approximation
-                orbital_distance = float(planet['pl_orbsmax'])
-                star_temp = float(planet.get('st_teff', 5778))  # Sun = 5778K
-                
-                # Rough estimate of habitable zone
-                inner_hz = (star_temp/5778)**2 * 0.75  # Inner edge
-                outer_hz = (star_temp/5778)**2 * 1.8   # Outer edge
-                
-                is_habitable = inner_hz <= orbital_distance <= outer_hz
-                
-                st.write("**Potentially Habitable:**", 
-                        "Yes ✨" if is_habitable else "No")
+    show_exoplanet_results(float(bounds['pl_orbsmax'].max()), float(bounds['pl_rade'].max()), loaded['similar_planets'])
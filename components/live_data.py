@@ -1,9 +1,144 @@
 import streamlit as st
-import plotly.express as px
+import plotly.graph_objects as go
+import numpy as np
 import pandas as pd
-from datetime import datetime
+from datetime import date, datetime, timedelta
 from api.space_data import SpaceAPI
+from api.iss_tracker import SAMPLE_INTERVAL, HISTORY_SECONDS, split_at_antimeridian
 from utils.helpers import format_number, get_hazard_emoji
+from components.paginated_table import show_paginated_table
+from components.stages import stage
+from utils import metrics
+
+# Longest close-approach window the NEO tab will request at once
+NEO_MAX_RANGE_DAYS = 60
+
+# The ISS panel reruns on its own timer, in step with the background sampler
+ISS_REFRESH_SECONDS = SAMPLE_INTERVAL
+
+@metrics.timed('figure_build_seconds', figure='iss_map')
+def build_iss_map(iss_data, track=None):
+    """Build the ISS map: optional (lat, lon, timestamp) ground track plus the current position"""
+    fig = go.Figure()
+    if track is not None:
+        lat, lon, _ = track
+        lat, lon = split_at_antimeridian(lat, lon)
+        fig.add_trace(go.Scattermapbox(
+            lat=lat,
+            lon=lon,
+            mode='lines',
+            name='Ground track',
+            hoverinfo='skip'
+        ))
+    fig.add_trace(go.Scattermapbox(
+        lat=[iss_data['latitude']],
+        lon=[iss_data['longitude']],
+        mode='markers',
+        name='ISS',
+        hovertext=['ISS'],
+        hoverinfo='text',
+        marker={'size': 12}
+    ))
+    
+    fig.update_layout(
+        mapbox={
+            'style': "open-street-map",
+            'zoom': 1,
+            'center': {'lat': iss_data['latitude'], 'lon': iss_data['longitude']}
+        },
+        margin={"r":0,"t":0,"l":0,"b":0},
+        showlegend=False,
+        # Keep the user's pan/zoom across timed refreshes
+        uirevision='iss'
+    )
+    return fig
+
+@st.fragment(run_every=ISS_REFRESH_SECONDS)
+@metrics.timed('page_script_seconds', page='ISS Tracker (fragment)')
+def show_iss_tracker():
+    """ISS map, ground track and coordinates; refreshes without re-running the page"""
+    space_api = SpaceAPI()
+    
+    # Latest position from the shared sampler, no upstream call per session
+    iss_data = space_api.get_iss_location()
+    
+    if not iss_data:
+        st.error("Unable to fetch ISS location data. Please try again later.")
+        return
+    
+    trail_minutes = st.slider(
+        "Ground track (minutes)",
+        0,
+        HISTORY_SECONDS // 60,
+        45,
+        step=5,
+        key="iss_trail_minutes"
+    )
+    
+    # Create a map using plotly: the recent ground track plus the current position
+    track = space_api.get_iss_track(trail_minutes) if trail_minutes else None
+    fig = build_iss_map(iss_data, track)
+    
+    # Display the map
+    st.plotly_chart(fig, use_container_width=True)
+    
+    # Display coordinates
+    col1, col2 = st.columns(2)
+    with col1:
+        st.metric("Latitude", f"{format_number(iss_data['latitude'])}°")
+    with col2:
+        st.metric("Longitude", f"{format_number(iss_data['longitude'])}°")
+    
+    # Add timestamp
+    st.caption(f"Last updated: {datetime.fromtimestamp(iss_data['timestamp'])}")
+
+def filter_neos(asteroids, hazardous_only, miss_limit):
+    """Objects passing within miss_limit lunar distances, optionally only hazardous ones"""
+    mask = asteroids['miss_distance_ld'] <= miss_limit
+    if hazardous_only:
+        mask &= asteroids['hazardous']
+    return asteroids[mask]
+
+def neo_details(filtered):
+    """The NEO details table, with display names and units"""
+    return pd.DataFrame({
+        'Name': filtered['name'] + ' ' + filtered['hazardous'].map({True: get_hazard_emoji(True), False: get_hazard_emoji(False)}),
+        'Min Diameter (km)': filtered['diameter_min_km'],
+        'Max Diameter (km)': filtered['diameter_max_km'],
+        'Relative Velocity (km/h)': filtered['velocity_kph'],
+        'Miss Distance (km)': filtered['miss_distance_km'],
+        'Miss Distance (LD)': filtered['miss_distance_ld'],
+        'Close Approach': filtered['approach_time'],
+    })
+
+@st.fragment
+@metrics.timed('page_script_seconds', page='Near-Earth Objects (fragment)')
+def show_neo_details(asteroids):
+    """NEO filters and details table; filtering or paging reruns only this"""
+    col1, col2 = st.columns(2)
+    with col1:
+        hazardous_only = st.checkbox("Potentially hazardous only", key="neo_hazardous_only")
+    with col2:
+        max_ld = float(np.ceil(asteroids['miss_distance_ld'].max()))
+        miss_limit = st.slider(
+            "Max miss distance (lunar distances)",
+            0.0,
+            max(max_ld, 1.0),
+            max(max_ld, 1.0),
+            key="neo_miss_limit"
+        )
+    filtered = stage('neo_filter', filter_neos, asteroids, hazardous_only, miss_limit)
+    
+    # Display detailed information for each asteroid
+    st.subheader("Detailed Information")
+    
+    # One paged table instead of an expander per object
+    show_paginated_table(
+        stage('neo_details', neo_details, filtered),
+        key="neo_details",
+        search_column="Name",
+        default_sort="Miss Distance (km)"
+    )
 
 def show_live_space_data():
     space_api = SpaceAPI()
@@ -13,86 +148,47 @@ def show_live_space_data():
     
     with tab1:
         st.subheader("🛸 International Space Station Location")
-        
-        # Get ISS location
-        iss_data = space_api.get_iss_location()
-        
-        if iss_data:
-            # Create a DataFrame for the ISS location
-            iss_df = pd.DataFrame([{
-                'lat': iss_data['latitude'],
-                'lon': iss_data['longitude'],
-                'name': 'ISS'
-            }])
-            
-            # Create a map using plotly
-            fig = px.scatter_mapbox(
-                iss_df,
-                lat='lat',
-                lon='lon',
-                hover_name='name',
-                zoom=1
-            )
-            
-            fig.update_layout(
-                mapbox_style="open-street-map",
-                margin={"r":0,"t":0,"l":0,"b":0}
-            )
-            
-            # Display the map
-            st.plotly_chart(fig, use_container_width=True)
-            
-            # Display coordinates
-            col1, col2 = st.columns(2)
-            with col1:
-                st.metric("Latitude", f"{format_number(iss_data['latitude'])}°")
-            with col2:
-                st.metric("Longitude", f"{format_number(iss_data['longitude'])}°")
-            
-            # Add timestamp
-            st.caption(f"Last updated: {datetime.fromtimestamp(iss_data['timestamp'])}")
-        else:
-            st.error("Unable to fetch ISS location data. Please try again later.")
+        show_iss_tracker()
     
     with tab2:
         st.subheader("☄️ Near-Earth Objects")
         
+        # Approach date range; past days are cached permanently, so wide
+        # ranges only cost upstream requests for days not seen before
+        today = date.today()
+        selected = st.date_input(
+            "Close approach dates",
+            (today, today + timedelta(days=6)),
+            min_value=today - timedelta(days=365),
+            max_value=today + timedelta(days=365),
+            key="neo_dates"
+        )
+        if len(selected) == 0:
+            st.info("Pick a date range to see near-Earth objects.")
+            return
+        # While a range is being picked the widget returns a single date
+        start_date, end_date = selected if len(selected) == 2 else (selected[0], selected[0])
+        if (end_date - start_date).days >= NEO_MAX_RANGE_DAYS:
+            end_date = start_date + timedelta(days=NEO_MAX_RANGE_DAYS - 1)
+            st.caption(f"Showing the first {NEO_MAX_RANGE_DAYS} days of the selected range.")
+        
         # Get asteroid data
-        asteroids = space_api.get_asteroid_data()
+        asteroids = space_api.get_asteroid_feed(start_date, end_date)
         
-        if asteroids:
-            # Create a summary
-            total_asteroids = len(asteroids)
-            hazardous_count = sum(1 for ast in asteroids if ast['is_potentially_hazardous_asteroid'])
-            
-            # Display summary metrics
-            col1, col2 = st.columns(2)
+        if asteroids is None:
+            st.error("Unable to fetch asteroid data. Please try again later.")
+        elif asteroids.empty:
+            st.info("No near-Earth objects approach in the selected dates.")
+        else:
+            # Display summary metrics, computed on the numeric columns
+            col1, col2, col3, col4 = st.columns(4)
             with col1:
-                st.metric("Total Objects", total_asteroids)
+                st.metric("Total Objects", len(asteroids))
             with col2:
-                st.metric("Potentially Hazardous", hazardous_count)
-            
-            # Display detailed information for each asteroid
-            st.subheader("Detailed Information")
+                st.metric("Potentially Hazardous", int(asteroids['hazardous'].sum()))
+            with col3:
+                st.metric("Closest Approach", f"{format_number(asteroids['miss_distance_ld'].min())} LD")
+            with col4:
+                st.metric("Largest Object", f"{format_number(asteroids['diameter_max_km'].max())} km")
             
-            for asteroid in asteroids:
-                # Create an expander for each asteroid
-                with st.expander(f"{asteroid['name']} {get_hazard_emoji(asteroid['is_potentially_hazardous_asteroid'])}"):
-                    col1, col2 = st.columns(2)
-                    
-                    with col1:
-                        st.write("**Estimated Diameter:**")
-                        st.write(f"Min: {format_number(asteroid['estimated_diameter']['kilometers']['estimated_diameter_min'])} km")
-                        st.write(f"Max: {format_number(asteroid['estimated_diameter']['kilometers']['estimated_diameter_max'])} km")
-                        
-                        st.write("**Relative Velocity:**")
-                        st.write(f"{format_number(float(asteroid['close_approach_data'][0]['relative_velocity']['kilometers_per_hour']))} km/h")
-                    
-                    with col2:
-                        st.write("**Miss Distance:**")
-                        st.write(f"{format_number(float(asteroid['close_approach_data'][0]['miss_distance']['kilometers']))} km")
-                        
-                        st.write("**Close Approach Date:**")
-                        st.write(asteroid['close_approach_data'][0]['close_approach_date_full'])
-        else:
-            st.error("Unable to fetch asteroid data. Please try again later.")
+            show_neo_details(asteroids)
@@ -0,0 +1,91 @@
+import math
+import numpy as np
+import streamlit as st
+
+PAGE_SIZES = [10, 25, 50, 100]
+
+
+def show_paginated_table(df, key, search_column=None, default_sort=None, descending=False, selectable=False):
+    """Render one page of df in a single st.dataframe with page size, sort and jump-to controls.
+
+    Sorting happens on the full frame, but only the visible slice is passed to
+    st.dataframe, so the payload sent to the browser is bounded by the page
+    size rather than the dataset size. Returns the rows on the current page.
+
+    With selectable, a row can be picked by clicking it; its index label in df
+    is kept in st.session_state[f"{key}_selected"] (None when nothing is picked).
+    """
+    page_key = f"{key}_page"
+    jump_key = f"{key}_last_jump"
+    selected_key = f"{key}_selected"
+
+    col1, col2, col3, col4 = st.columns([1, 2, 1, 2])
+    with col1:
+        page_size = st.selectbox("Rows per page", PAGE_SIZES, key=f"{key}_page_size")
+    with col2:
+        columns = list(df.columns)
+        sort_column = st.selectbox(
+            "Sort by",
+            columns,
+            index=columns.index(default_sort) if default_sort in columns else 0,
+            key=f"{key}_sort"
+        )
+    with col3:
+        sort_descending = st.checkbox("Descending", value=descending, key=f"{key}_descending")
+    with col4:
+        jump = st.text_input(
+            "Jump to",
+            key=f"{key}_jump",
+            placeholder=f"Search {search_column}" if search_column else "Search",
+            disabled=search_column is None
+        )
+
+    sorted_df = df.sort_values(
+        sort_column,
+        ascending=not sort_descending,
+        na_position='last',
+        kind='stable'
+    )
+    page_count = max(1, math.ceil(len(sorted_df) / page_size))
+
+    # Clamp the remembered page, which may be out of range after a filter change
+    st.session_state[page_key] = min(max(st.session_state.get(page_key, 1), 1), page_count)
+
+    # Jump once per new search text so the page controls keep working afterwards
+    if search_column and jump and jump != st.session_state.get(jump_key):
+        st.session_state[jump_key] = jump
+        matches = np.flatnonzero(
+            sorted_df[search_column].astype(str).str.contains(jump, case=False, regex=False).to_numpy()
+        )
+        if len(matches):
+            st.session_state[page_key] = int(matches[0]) // page_size + 1
+        else:
+            st.caption(f"No match for \"{jump}\"")
+
+    page = st.number_input(
+        f"Page (of {page_count})",
+        min_value=1,
+        max_value=page_count,
+        step=1,
+        key=page_key
+    )
+
+    start = (page - 1) * page_size
+    page_df = sorted_df.iloc[start:start + page_size]
+    if selectable:
+        # Keyed on the rows shown, so paging, sorting or filtering starts a
+        # fresh selection instead of carrying a row position over to another row
+        event = st.dataframe(
+            page_df,
+            use_container_width=True,
+            hide_index=True,
+            on_select="rerun",
+            selection_mode="single-row",
+            key=f"{key}_rows_{hash(tuple(page_df.index))}"
+        )
+        rows = event.selection.rows
+        st.session_state[selected_key] = page_df.index[rows[0]] if rows else None
+    else:
+        st.dataframe(page_df, use_container_width=True, hide_index=True)
+    st.caption(f"Showing {start + 1 if len(page_df) else 0}–{start + len(page_df)} of {len(sorted_df)}")
+    return page_df
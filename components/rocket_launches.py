@@ -1,78 +1,150 @@
+import sys
 import streamlit as st
 from datetime import datetime, timedelta
 import plotly.graph_objects as go
 from api.space_data import SpaceAPI
-from utils.helpers import format_datetime, calculate_time_until, filter_launches
+from components.stages import stage
+from utils.helpers import format_datetime, calculate_time_until
+from utils import metrics
 
-def show_rocket_launches():
-    space_api = SpaceAPI()
-    
-    # Fetch launches
-    launches = space_api.get_upcoming_launches()
+# Above this many launches the timeline switches to WebGL and drops the
+# per-point text labels, which the browser can no longer lay out quickly
+WEBGL_THRESHOLD = 500
+
+@st.cache_data(max_entries=32, show_spinner=False)
+@metrics.timed('figure_build_seconds', figure='launch_timeline')
+def build_launch_timeline(launches):
+    """Build the launch timeline figure spec for a tuple of (name, ISO date) pairs.
+
+    All launches go into a single trace and Plotly parses the ISO dates itself
+    (minus the UTC 'Z' suffix it doesn't accept), so nothing is strptime'd.
+    Cached on the launch tuple, so reruns with an unchanged filter reuse it.
+    """
+    # Plotly's validators use pandas from sys.modules when it is there. A
+    # loader on a background thread may be halfway through importing it, so
+    # wait for that import to finish (this never starts one itself)
+    if 'pandas' in sys.modules:
+        import pandas  # noqa: F401
+
+    names = [name for name, _ in launches]
+    dates = [date.rstrip('Z') for _, date in launches]
+    large = len(launches) > WEBGL_THRESHOLD
     
-    # Filters
-    st.sidebar.subheader("Filter Launches")
+    trace = go.Scattergl if large else go.Scatter
+    fig = go.Figure(trace(
+        x=dates,
+        y=names,
+        mode='markers' if large else 'markers+text',
+        text=names,
+        textposition='top center',
+        hovertemplate='%{y}<br>%{x}<extra></extra>'
+    ))
     
-    # Date range filter
-    start_date = st.sidebar.date_input(
-        "Start Date",
-        datetime.now()
+    fig.update_layout(
+        title="Launch Timeline",
+        xaxis_title="Date",
+        yaxis_title="Mission",
+        showlegend=False
     )
-    end_date = st.sidebar.date_input(
-        "End Date",
-        datetime.now() + timedelta(days=90)
+    return fig.to_dict()
+
+def format_launchpad(launch):
+    """Launchpad name and location, or its ID when it couldn't be resolved"""
+    pad = launch.launchpad_info
+    if not pad:
+        return launch.launchpad
+    place = ", ".join(part for part in (pad.get('locality'), pad.get('region')) if part)
+    name = pad.get('full_name') or pad.get('name') or launch.launchpad
+    return f"{name} ({place})" if place else name
+
+def format_payload(payload):
+    """Payload name with its orbit and mass when known"""
+    facts = [payload.get('orbit'), f"{payload['mass_kg']:,} kg" if payload.get('mass_kg') else None]
+    facts = ", ".join(fact for fact in facts if fact)
+    name = payload.get('name') or payload['id']
+    return f"{name} ({facts})" if facts else name
+
+def filter_launches(launches, start_date, end_date, organization):
+    """Launches in the date range (bisect on the pre-sorted dates) whose name mentions organization"""
+    return launches.filter(
+        start_date=datetime.combine(start_date, datetime.min.time()),
+        end_date=datetime.combine(end_date, datetime.max.time()),
+        organization=None if organization == "All" else organization
     )
+
+def launch_details(launches):
+    """Per-launch (launch, formatted time, rocket, launchpad, payloads) rows for the expanders"""
+    return [(
+        launch,
+        format_datetime(launch.date),
+        launch.rocket_info['name'] if launch.rocket_info else launch.rocket,
+        format_launchpad(launch),
+        ", ".join(format_payload(p) for p in launch.payloads)
+    ) for launch in launches]
+
+@st.fragment
+@metrics.timed('page_script_seconds', page='Rocket Launches (fragment)')
+def show_launch_explorer(launches):
+    """Filters, timeline and launch details; a filter change reruns only this"""
+    st.subheader("Filter Launches")
+    col1, col2, col3 = st.columns(3)
+    
+    # Date range filter
+    with col1:
+        start_date = st.date_input(
+            "Start Date",
+            datetime.now().date(),
+            key="launch_start_date"
+        )
+    with col2:
+        end_date = st.date_input(
+            "End Date",
+            datetime.now().date() + timedelta(days=90),
+            key="launch_end_date"
+        )
     
     # Organization filter
-    organizations = ["All", "SpaceX", "NASA", "ULA", "Rocket Lab"]
-    selected_org = st.sidebar.selectbox("Organization", organizations)
+    with col3:
+        organizations = ["All", "SpaceX", "NASA", "ULA", "Rocket Lab"]
+        selected_org = st.selectbox("Organization", organizations, key="launch_organization")
     
-    # Apply filters
-    filtered_launches = filter_launches(
-        launches,
-        start_date=datetime.combine(start_date, datetime.min.time()),
-        end_date=datetime.combine(end_date, datetime.max.time()),
-        organization=None if selected_org == "All" else selected_org
-    )
+    # Each stage reruns only when its inputs changed
+    filtered_launches = stage('launch_filter', filter_launches, launches, start_date, end_date, selected_org)
     
     # Display launches
     if filtered_launches:
         # Timeline visualization
-        fig = go.Figure()
-        
-        for launch in filtered_launches:
-            launch_date = datetime.strptime(launch['date'], "%Y-%m-%dT%H:%M:%S.%fZ")
-            fig.add_trace(go.Scatter(
-                x=[launch_date],
-                y=[launch['name']],
-                mode='markers+text',
-                name=launch['name'],
-                text=[launch['name']],
-                textposition='top center'
-            ))
-        
-        fig.update_layout(
-            title="Launch Timeline",
-            xaxis_title="Date",
-            yaxis_title="Mission",
-            showlegend=False
+        fig = stage(
+            'launch_timeline',
+            lambda launches: build_launch_timeline(tuple((launch.name, launch.date_str) for launch in launches)),
+            filtered_launches
         )
         
         st.plotly_chart(fig, use_container_width=True)
         
         # Detailed launch information
-        for launch in filtered_launches:
-            with st.expander(f"{launch['name']} - {format_datetime(launch['date'])}"):
+        for launch, launch_time, rocket, launchpad, payloads in stage('launch_details', launch_details, filtered_launches):
+            with st.expander(f"{launch.name} - {launch_time}"):
                 col1, col2 = st.columns(2)
                 
                 with col1:
-                    st.write("**Launch Time:**", format_datetime(launch['date']))
-                    st.write("**Time Until Launch:**", calculate_time_until(launch['date']))
-                    st.write("**Rocket:**", launch['rocket'])
+                    st.write("**Launch Time:**", launch_time)
+                    st.write("**Time Until Launch:**", calculate_time_until(launch.date))
+                    st.write("**Rocket:**", rocket)
                 
                 with col2:
-                    st.write("**Launchpad:**", launch['launchpad'])
-                    if launch['details']:
-                        st.write("**Mission Details:**", launch['details'])
+                    st.write("**Launchpad:**", launchpad)
+                    if payloads:
+                        st.write("**Payloads:**", payloads)
+                    if launch.details:
+                        st.write("**Mission Details:**", launch.details)
     else:
         st.warning("No launches found matching the selected criteria.")
+
+def show_rocket_launches():
+    space_api = SpaceAPI()
+    
+    # Fetch launches; parsed and indexed once per payload
+    launches = space_api.get_upcoming_launches()
+    
+    show_launch_explorer(launches)
@@ -0,0 +1,28 @@
+from datetime import date
+import streamlit as st
+
+# Inputs of these types are compared by value; anything else (frames, indexes,
+# lists from an earlier stage) by identity
+_VALUE_TYPES = (str, int, float, bool, tuple, date, type(None))
+
+
+def stage(name, compute, *inputs):
+    """Return compute(*inputs), reusing this session's last result for stage name while its inputs are unchanged.
+
+    Pages chain stages (fetch, normalize, filter, figure, details), passing each
+    stage's result object on to the next, so a widget change recomputes only
+    the stages downstream of it. Only the latest result per stage is kept.
+    """
+    key = f"_stage_{name}"
+    previous = st.session_state.get(key)
+    if previous is not None and len(previous[0]) == len(inputs) and all(map(_same, previous[0], inputs)):
+        return previous[1]
+    value = compute(*inputs)
+    st.session_state[key] = (inputs, value)
+    return value
+
+
+def _same(a, b):
+    if a is b:
+        return True
+    return isinstance(a, _VALUE_TYPES) and type(a) is type(b) and a == b
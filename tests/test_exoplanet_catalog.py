@@ -0,0 +1,94 @@
+import re
+import pytest
+import requests
+from api import exoplanet_catalog
+from api.exoplanet_catalog import COLUMNS, ExoplanetCatalog
+
+
+class FakeResponse:
+    def __init__(self, lines):
+        self.lines = lines
+        self.status_code = 200
+        self.encoding = 'utf-8'
+
+    def raise_for_status(self):
+        pass
+
+    def iter_lines(self, decode_unicode=False):
+        return iter(self.lines)
+
+    def close(self):
+        pass
+
+
+class FakeTAP:
+    """Answers the catalog's paged queries from rows {pl_name: rowupdate}; can time out on one page"""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.fail_after = None
+        self.queries = []
+
+    def get(self, url, params=None, stream=False):
+        query = params['query']
+        self.queries.append(query)
+        after = re.search(r"pl_name > '([^']*)'", query).group(1)
+        if self.fail_after is not None and after == self.fail_after:
+            self.fail_after = None
+            raise requests.Timeout("page timed out")
+        since = re.search(r"rowupdate >= '([^']*)'", query)
+        top = int(re.search(r"top (\d+)", query).group(1))
+        names = sorted(
+            name for name, updated in self.rows.items()
+            if name > after and (since is None or updated >= since.group(1))
+        )[:top]
+        lines = [','.join(COLUMNS)]
+        for name in names:
+            values = {'pl_name': name, 'rowupdate': self.rows[name]}
+            lines.append(','.join(values.get(column, '') for column in COLUMNS))
+        return FakeResponse(lines)
+
+
+@pytest.fixture
+def small_pages(monkeypatch):
+    monkeypatch.setattr(exoplanet_catalog, 'PAGE_SIZE', 2)
+
+
+def _stored(catalog):
+    with catalog._lock:
+        return [name for name, in catalog._connect().execute("select pl_name from planets order by pl_name")]
+
+
+def test_interrupted_sync_is_completed_by_the_next_refresh(tmp_path, small_pages):
+    tap = FakeTAP({'a': '2024-06-01', 'b': '2024-06-01', 'c': '2024-01-01', 'd': '2024-01-01'})
+    catalog = ExoplanetCatalog(tap, 'http://tap', tmp_path / 'exoplanets.sqlite3')
+
+    tap.fail_after = 'b'
+    with pytest.raises(requests.Timeout):
+        catalog.refresh()
+    assert _stored(catalog) == ['a', 'b']
+
+    assert catalog.refresh() == ('2024-06-01', 4)
+    assert _stored(catalog) == ['a', 'b', 'c', 'd']
+
+
+def test_interrupted_incremental_refresh_keeps_the_old_watermark(tmp_path, small_pages):
+    tap = FakeTAP({'a': '2024-01-01', 'b': '2024-01-01', 'c': '2024-01-01'})
+    catalog = ExoplanetCatalog(tap, 'http://tap', tmp_path / 'exoplanets.sqlite3')
+    catalog.refresh()
+
+    tap.rows.update({'a': '2024-06-01', 'b': '2024-06-01', 'c': '2024-03-01', 'e': '2024-03-01'})
+    tap.fail_after = 'b'
+    with pytest.raises(requests.Timeout):
+        catalog.refresh()
+
+    tap.queries.clear()
+    assert catalog.refresh() == ('2024-06-01', 4)
+    assert _stored(catalog) == ['a', 'b', 'c', 'e']
+    # Still asked from the last completed refresh's watermark, not the newest row
+    assert "rowupdate >= '2024-01-01'" in tap.queries[0]
+
+    # A completed refresh moves it
+    tap.queries.clear()
+    catalog.refresh()
+    assert "rowupdate >= '2024-06-01'" in tap.queries[0]
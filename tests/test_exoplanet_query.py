@@ -0,0 +1,122 @@
+import pandas as pd
+import pytest
+from api.exoplanet_query import (
+    DERIVED_INPUTS, Filter, QueryCache, _implied, covers, evaluate, make_query
+)
+
+
+def test_make_query_keeps_tightest_bounds():
+    query = make_query([
+        Filter('pl_rade', '>=', 1.0),
+        Filter('pl_rade', '>=', 2.0),
+        Filter('pl_rade', '<=', 5.0),
+        Filter('pl_rade', '<=', 3.0),
+    ])
+    assert query.filters == (Filter('pl_rade', '<=', 3.0), Filter('pl_rade', '>=', 2.0))
+
+
+def test_make_query_turns_equality_into_in_and_intersects_sets():
+    query = make_query([
+        Filter('discoverymethod', 'in', ('Transit', 'Imaging')),
+        Filter('discoverymethod', '=', 'Transit'),
+    ])
+    assert query.filters == (Filter('discoverymethod', 'in', ('Transit',)),)
+
+
+def test_make_query_equivalent_queries_compare_equal():
+    a = make_query([Filter('pl_rade', '<=', 2.0), Filter('disc_year', '>=', 2000)], columns=['pl_rade', 'disc_year'])
+    b = make_query([Filter('disc_year', '>=', 2000), Filter('pl_rade', '<=', 2.0)], columns=['disc_year', 'pl_name', 'pl_rade'])
+    assert a == b
+    assert a.columns == ('disc_year', 'pl_name', 'pl_rade')
+
+
+@pytest.mark.parametrize('kwargs', [
+    {'filters': [Filter('nope', '>=', 1)]},
+    {'filters': [Filter('pl_rade', '!=', 1)]},
+    {'columns': ['pl_rade', 'nope']},
+    {'order_by': 'nope'},
+])
+def test_make_query_rejects_unknown_columns_and_operators(kwargs):
+    with pytest.raises(ValueError):
+        make_query(**kwargs)
+
+
+@pytest.mark.parametrize('wider, narrower, implied', [
+    (Filter('pl_rade', '>=', 1.0), [Filter('pl_rade', '>=', 2.0)], True),
+    (Filter('pl_rade', '>=', 1.0), [Filter('pl_rade', '>=', 1.0)], True),
+    (Filter('pl_rade', '>=', 2.0), [Filter('pl_rade', '>=', 1.0)], False),
+    (Filter('pl_rade', '<=', 5.0), [Filter('pl_rade', '<=', 3.0)], True),
+    (Filter('pl_rade', '<=', 3.0), [Filter('pl_rade', '<=', 5.0)], False),
+    (Filter('pl_rade', '>=', 1.0), [Filter('pl_rade', '<=', 3.0)], False),
+    (Filter('pl_rade', '>=', 1.0), [Filter('pl_masse', '>=', 2.0)], False),
+    (Filter('discoverymethod', 'in', ('Imaging', 'Transit')), [Filter('discoverymethod', 'in', ('Transit',))], True),
+    (Filter('discoverymethod', 'in', ('Transit',)), [Filter('discoverymethod', 'in', ('Imaging', 'Transit'))], False),
+    (Filter('disc_year', '>=', 2000), [Filter('disc_year', 'in', (2005, 2010))], True),
+    (Filter('disc_year', '<=', 2006), [Filter('disc_year', 'in', (2005, 2010))], False),
+])
+def test_implied(wider, narrower, implied):
+    assert _implied(wider, narrower) is implied
+
+
+def test_covers_narrower_filters_on_a_complete_result():
+    wider = make_query([Filter('pl_rade', '<=', 5.0)])
+    assert covers(wider, True, make_query([Filter('pl_rade', '<=', 2.0), Filter('disc_year', '>=', 2000)]))
+    assert not covers(wider, True, make_query([Filter('pl_rade', '<=', 8.0)]))
+    assert not covers(wider, True, make_query())
+
+
+def test_covers_needs_the_narrower_columns():
+    wider = make_query(columns=['pl_rade', 'disc_year'])
+    available = {'pl_name', 'pl_rade', 'disc_year'}
+    assert covers(wider, True, make_query([Filter('pl_rade', '<=', 2.0)], columns=['pl_rade']), available)
+    assert not covers(wider, True, make_query(columns=['pl_masse']), available)
+    assert not covers(wider, True, make_query(), available)
+
+
+def test_covers_truncated_result_only_answers_smaller_limits():
+    wider = make_query([Filter('pl_rade', '<=', 5.0)], limit=100)
+    assert covers(wider, False, make_query([Filter('pl_rade', '<=', 5.0)], limit=50))
+    assert not covers(wider, False, make_query([Filter('pl_rade', '<=', 5.0)], limit=200))
+    assert not covers(wider, False, make_query([Filter('pl_rade', '<=', 2.0)], limit=50))
+    assert not covers(wider, False, make_query([Filter('pl_rade', '<=', 5.0)], order_by='pl_rade', limit=50))
+
+
+def _catalog():
+    rows = {
+        'pl_name': ['a', 'b', 'c'],
+        'disc_year': [2001, 2010, 2020],
+        'pl_orbsmax': [1.0, 0.05, 2.0],
+        'pl_rade': [1.0, 11.0, 1.5],
+        'pl_eqt': [255.0, 1400.0, 200.0],
+        'pl_insol': [1.0, 400.0, 0.3],
+        'st_teff': [5772.0, 6000.0, 5000.0],
+        'st_rad': [1.0, 1.2, 0.8],
+        'st_lum': [0.0, 0.2, -0.3],
+        'esi': [1.0, 0.1, 0.8],
+    }
+    return pd.DataFrame(rows)
+
+
+def test_query_cache_does_not_answer_derived_columns_from_a_projected_result():
+    cache = QueryCache()
+    catalog = _catalog()
+    inputs = make_query(columns=DERIVED_INPUTS, order_by='pl_rade')
+    cache.answer(inputs, 1, lambda: catalog)
+
+    # The cached result holds the inputs but not esi itself
+    query = make_query([Filter('esi', '>=', 0.5)], columns=['esi'], order_by='pl_rade')
+    result = cache.answer(query, 1, lambda: catalog)
+    assert list(result['pl_name']) == ['c', 'a']
+
+
+def test_query_cache_answers_narrower_queries_from_a_wider_result():
+    cache = QueryCache()
+    catalog = _catalog()
+    cache.answer(make_query([Filter('pl_rade', '<=', 5.0)]), 1, lambda: catalog)
+
+    def unexpected():
+        raise AssertionError("covered query went to the source")
+
+    result = cache.answer(make_query([Filter('disc_year', '>=', 2010), Filter('pl_rade', '<=', 2.0)]), 1, unexpected)
+    assert list(result['pl_name']) == ['c']
+    assert result.equals(evaluate(make_query([Filter('disc_year', '>=', 2010), Filter('pl_rade', '<=', 2.0)]), catalog))
@@ -0,0 +1,45 @@
+import numpy as np
+
+
+def bin_edges(low, high, bins, log_scale=False):
+    """Return bins + 1 edges spanning [low, high], evenly spaced in log10 when log_scale (low > 0).
+
+    An empty range is widened to one unit (one decade on a log scale), since
+    the edges must increase.
+    """
+    if log_scale:
+        return np.geomspace(low, high if high > low else low * 10, bins + 1)
+    return np.linspace(low, high if high > low else low + 1, bins + 1)
+
+
+def _log_range(values, low, high):
+    # A log axis can't start at zero; start at the smallest positive value
+    if low > 0:
+        return low, high
+    positive = values[(values > 0) & (values <= high)]
+    low = positive.min() if len(positive) else high / 10
+    return low, high
+
+
+def bin_points(x, y, x_range, y_range, bins, log_x=False, log_y=False):
+    """Count points on a bins x bins grid over x_range and y_range.
+
+    Returns (x_edges, y_edges, counts) where counts[j, i] is the number of
+    points in y bin j and x bin i, the layout Plotly heatmaps expect. Points
+    outside the ranges, missing a coordinate or non-positive on a log axis
+    are not counted; a log axis whose range starts at zero or below starts at
+    the smallest positive value instead. Cost is linear in the number of
+    points and the result size depends only on bins.
+    """
+    x = np.asarray(x, dtype='float64')
+    y = np.asarray(y, dtype='float64')
+    if log_x:
+        x_range = _log_range(x, *x_range)
+    if log_y:
+        y_range = _log_range(y, *y_range)
+    x_edges = bin_edges(*x_range, bins, log_x)
+    y_edges = bin_edges(*y_range, bins, log_y)
+    keep = np.isfinite(x) & np.isfinite(y)
+    # Non-positive values fall outside log edges anyway
+    counts, _, _ = np.histogram2d(x[keep], y[keep], bins=(x_edges, y_edges))
+    return x_edges, y_edges, counts.T
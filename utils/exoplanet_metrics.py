@@ -0,0 +1,61 @@
+import numpy as np
+
+SUN_TEFF = 5778.0          # K
+SOLAR_RADIUS_AU = 0.00465047
+BOND_ALBEDO = 0.3          # Earth-like albedo assumed for equilibrium temperature
+
+# Habitable zone edges for a Sun-like star, in AU; scaled by sqrt(L / L_sun)
+HZ_INNER_AU = 0.75
+HZ_OUTER_AU = 1.8
+
+
+def stellar_luminosity(df):
+    """Return stellar luminosity in solar units, from st_lum, else st_rad and st_teff"""
+    teff = df['st_teff'].to_numpy(dtype='float64', na_value=np.nan)
+    radius = df['st_rad'].to_numpy(dtype='float64', na_value=np.nan)
+    log_lum = df['st_lum'].to_numpy(dtype='float64', na_value=np.nan)
+
+    # Without a radius assume a Sun-sized star, which reduces to (T/T_sun)^4
+    from_teff = np.where(np.isnan(radius), 1.0, radius) ** 2 * (teff / SUN_TEFF) ** 4
+    return np.where(np.isnan(log_lum), from_teff, 10.0 ** log_lum)
+
+
+def add_derived_metrics(df):
+    """Return df with habitable-zone, equilibrium temperature and ESI columns added.
+
+    Every metric is computed on whole columns at once; rows missing the
+    inputs a metric needs get NaN (or False for the habitable-zone flag).
+    """
+    luminosity = stellar_luminosity(df)
+    orbit = df['pl_orbsmax'].to_numpy(dtype='float64', na_value=np.nan)
+    radius = df['pl_rade'].to_numpy(dtype='float64', na_value=np.nan)
+    teff = df['st_teff'].to_numpy(dtype='float64', na_value=np.nan)
+    star_radius = df['st_rad'].to_numpy(dtype='float64', na_value=np.nan)
+
+    scale = np.sqrt(luminosity)
+    hz_inner = HZ_INNER_AU * scale
+    hz_outer = HZ_OUTER_AU * scale
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # Equilibrium temperature; fall back to the catalog value when the
+        # stellar radius or orbit is unknown
+        eq_temp = (
+            teff * np.sqrt(star_radius * SOLAR_RADIUS_AU / (2 * orbit)) * (1 - BOND_ALBEDO) ** 0.25
+        )
+        eq_temp = np.where(np.isnan(eq_temp), df['pl_eqt'].to_numpy(dtype='float64', na_value=np.nan), eq_temp)
+
+        # Earth Similarity Index from radius and stellar flux (PHL formulation)
+        insolation = luminosity / orbit ** 2
+        insolation = np.where(np.isnan(insolation), df['pl_insol'].to_numpy(dtype='float64', na_value=np.nan), insolation)
+        esi = 1 - np.sqrt(0.5 * (
+            ((insolation - 1) / (insolation + 1)) ** 2 +
+            ((radius - 1) / (radius + 1)) ** 2
+        ))
+
+    return df.assign(
+        hz_inner=hz_inner.astype('float32'),
+        hz_outer=hz_outer.astype('float32'),
+        in_hz=(hz_inner <= orbit) & (orbit <= hz_outer),
+        eq_temp=eq_temp.astype('float32'),
+        esi=esi.astype('float32'),
+    )
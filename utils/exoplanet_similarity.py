@@ -0,0 +1,94 @@
+import numpy as np
+import pandas as pd
+from utils.exoplanet_metrics import SUN_TEFF
+
+# Features planets are compared on: column -> compared on a log scale. Radius,
+# mass, period and orbit span orders of magnitude, so a ratio matters more
+# than a difference
+FEATURES = {
+    'pl_rade': True,
+    'pl_masse': True,
+    'pl_orbper': True,
+    'pl_orbsmax': True,
+    'st_teff': False,
+}
+
+# Earth and the Sun in the same units
+EARTH = {
+    'pl_rade': 1.0,
+    'pl_masse': 1.0,
+    'pl_orbper': 365.256,
+    'pl_orbsmax': 1.0,
+    'st_teff': SUN_TEFF,
+}
+
+
+class SimilarityIndex:
+    """k-nearest-neighbour search over a catalog frame's normalized FEATURES.
+
+    Each feature is log-scaled where FEATURES says so and then standardized
+    (zero mean, unit variance over the catalog), so every feature weighs the
+    same in the Euclidean distance. Planets missing any feature are left out
+    of the index. The KD-tree is built once; queries don't touch the frame
+    beyond picking the result rows.
+    """
+
+    def __init__(self, df):
+        from scipy.spatial import cKDTree
+
+        features = self._scale(df)
+        complete = np.isfinite(features).all(axis=1)
+        self.df = df
+        self.rows = np.flatnonzero(complete)
+        features = features[complete]
+        self.mean = features.mean(axis=0) if len(features) else np.zeros(len(FEATURES))
+        self.std = features.std(axis=0) if len(features) else np.ones(len(FEATURES))
+        self.std[self.std == 0] = 1.0
+        self.points = (features - self.mean) / self.std
+        self.tree = cKDTree(self.points)
+        self.positions = {name: i for i, name in enumerate(df['pl_name'].to_numpy()[self.rows])}
+
+    def __len__(self):
+        return len(self.rows)
+
+    @staticmethod
+    def _scale(df):
+        columns = []
+        for column, log_scale in FEATURES.items():
+            values = df[column].to_numpy(dtype='float64', na_value=np.nan)
+            if log_scale:
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    values = np.log10(np.where(values > 0, values, np.nan))
+            columns.append(values)
+        return np.column_stack(columns)
+
+    def similar_to(self, name, k):
+        """Return the k planets nearest to the named one (itself excluded), nearest first.
+
+        The result holds the planets' catalog rows plus a 'distance' column;
+        it is empty when the planet is not in the index.
+        """
+        position = self.positions.get(name)
+        if position is None:
+            return self._result([], [])
+        return self._query(self.points[position], k, exclude=position)
+
+    def similar_to_earth(self, k):
+        """Return the k planets nearest to Earth, nearest first, with a 'distance' column"""
+        point = (self._scale(pd.DataFrame([EARTH]))[0] - self.mean) / self.std
+        return self._query(point, k)
+
+    def _query(self, point, k, exclude=None):
+        count = min(k + (exclude is not None), len(self.rows))
+        if count == 0:
+            return self._result([], [])
+        distances, positions = self.tree.query(point, k=count)
+        distances, positions = np.atleast_1d(distances), np.atleast_1d(positions)
+        if exclude is not None:
+            keep = positions != exclude
+            distances, positions = distances[keep][:k], positions[keep][:k]
+        return self._result(positions, distances)
+
+    def _result(self, positions, distances):
+        result = self.df.iloc[self.rows[np.asarray(positions, dtype=int)]]
+        return result.assign(distance=np.asarray(distances, dtype='float32')).reset_index(drop=True)
@@ -1,10 +1,11 @@
+import math
 from datetime import datetime
 import pytz
 
 def format_datetime(dt_str, input_format="%Y-%m-%dT%H:%M:%S.%fZ"):
-    """Convert UTC datetime string to readable format"""
+    """Convert UTC datetime string (or already-parsed naive UTC datetime) to readable format"""
     try:
-        dt = datetime.strptime(dt_str, input_format)
+        dt = dt_str if isinstance(dt_str, datetime) else datetime.strptime(dt_str, input_format)
         dt = pytz.UTC.localize(dt)
         return dt.strftime("%B %d, %Y %H:%M UTC")
     except Exception:
@@ -20,18 +21,24 @@ def calculate_distance_au_to_ly(au_distance):
 def format_number(number, decimal_places=2):
     """Format large numbers with comma separators and specified decimal places"""
     try:
-        return f"{float(number):,.{decimal_places}f}"
+        value = float(number)
     except (ValueError, TypeError):
         return "N/A"
+    if math.isnan(value):
+        return "N/A"
+    return f"{value:,.{decimal_places}f}"
 
 def get_hazard_emoji(is_hazardous):
     """Return appropriate emoji based on hazard status"""
     return "⚠️" if is_hazardous else "✅"
 
 def calculate_time_until(target_date_str):
-    """Calculate time until a future event"""
+    """Calculate time until a future event given as a UTC string or naive UTC datetime"""
     try:
-        target_date = datetime.strptime(target_date_str, "%Y-%m-%dT%H:%M:%S.%fZ")
+        if isinstance(target_date_str, datetime):
+            target_date = target_date_str
+        else:
+            target_date = datetime.strptime(target_date_str, "%Y-%m-%dT%H:%M:%S.%fZ")
         now = datetime.now(pytz.UTC)
         delta = target_date - now.replace(tzinfo=None)
         
@@ -0,0 +1,102 @@
+import threading
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+
+
+class Launch:
+    """A launch parsed once at ingestion; date is a naive UTC datetime.
+
+    rocket and launchpad are SpaceX IDs; rocket_info, launchpad_info and
+    payloads hold the entities they resolve to (see api.spacex_directory),
+    None or a bare {'id': ...} where an ID isn't resolved.
+    """
+
+    __slots__ = (
+        'name', 'date', 'date_str', 'details', 'rocket', 'launchpad', 'name_lower',
+        'rocket_info', 'launchpad_info', 'payloads'
+    )
+
+    def __init__(self, name, date, date_str, details, rocket, launchpad,
+                 rocket_info=None, launchpad_info=None, payloads=()):
+        self.name = name
+        self.date = date
+        self.date_str = date_str
+        self.details = details
+        self.rocket = rocket
+        self.launchpad = launchpad
+        self.name_lower = name.lower()
+        self.rocket_info = rocket_info
+        self.launchpad_info = launchpad_info
+        self.payloads = list(payloads)
+
+    @classmethod
+    def from_dict(cls, launch, entities=None):
+        """Build a Launch from a SpaceAPI launch dict, or return None if its date can't be parsed.
+
+        entities is {collection: {id: entity}} to resolve the rocket, launchpad
+        and payload IDs from.
+        """
+        date = parse_utc(launch['date'])
+        if date is None:
+            return None
+        entities = entities or {}
+        return cls(
+            launch['name'],
+            date,
+            launch['date'],
+            launch['details'],
+            launch['rocket'],
+            launch['launchpad'],
+            entities.get('rockets', {}).get(launch['rocket']),
+            entities.get('launchpads', {}).get(launch['launchpad']),
+            [
+                entities.get('payloads', {}).get(payload) or {'id': payload}
+                for payload in launch.get('payloads', [])
+            ]
+        )
+
+
+class LaunchIndex:
+    """Launches sorted by date, with bisect date-range lookups and a memoized organization index"""
+
+    def __init__(self, launches, entities=None):
+        records = (Launch.from_dict(launch, entities) for launch in launches)
+        self.launches = sorted((r for r in records if r is not None), key=lambda r: r.date)
+        self._dates = [launch.date for launch in self.launches]
+        self._org_positions = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.launches)
+
+    def __iter__(self):
+        return iter(self.launches)
+
+    def filter(self, start_date=None, end_date=None, organization=None):
+        """Return launches in [start_date, end_date] whose name mentions organization, by date"""
+        lo = bisect_left(self._dates, start_date) if start_date else 0
+        hi = bisect_right(self._dates, end_date) if end_date else len(self._dates)
+
+        if not organization:
+            return self.launches[lo:hi]
+
+        positions = self._positions_for(organization.lower())
+        return [self.launches[i] for i in positions[bisect_left(positions, lo):bisect_left(positions, hi)]]
+
+    def _positions_for(self, organization):
+        # The name scan runs once per organization per index; later filters
+        # reuse the sorted position list
+        with self._lock:
+            positions = self._org_positions.get(organization)
+            if positions is None:
+                positions = [i for i, launch in enumerate(self.launches) if organization in launch.name_lower]
+                self._org_positions[organization] = positions
+            return positions
+
+
+def parse_utc(date_str):
+    """Parse a SpaceX ISO 8601 UTC timestamp into a naive datetime, or None"""
+    try:
+        return datetime.fromisoformat(date_str[:-1] if date_str.endswith('Z') else date_str).replace(tzinfo=None)
+    except (ValueError, TypeError, AttributeError):
+        return None
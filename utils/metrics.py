@@ -0,0 +1,168 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BYTES_BUCKETS = tuple(1024 * 4 ** i for i in range(8))   # 1 KiB .. 16 MiB
+
+_HELP = {
+    'spaceapi_request_seconds': ('histogram', 'Upstream HTTP request latency'),
+    'spaceapi_response_bytes': ('histogram', 'Upstream response payload size'),
+    'spaceapi_requests_total': ('counter', 'Upstream HTTP requests by outcome'),
+    'spaceapi_retries_total': ('counter', 'Upstream HTTP retries'),
+    'spaceapi_cache_requests_total': ('counter', 'Response cache lookups by result'),
+    'spaceapi_coalesced_requests_total': ('counter', 'Upstream calls saved by joining an identical call in flight'),
+    'page_script_seconds': ('histogram', 'Page script run time'),
+    'page_import_seconds': ('histogram', 'Page module import time'),
+    'figure_build_seconds': ('histogram', 'Plotly figure build time'),
+    'similarity_index_build_seconds': ('histogram', 'Exoplanet similarity index build time'),
+}
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus style"""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)   # last slot is +Inf
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+
+    def quantile(self, q):
+        """Estimate a quantile by linear interpolation inside the matching bucket"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            if seen + count >= rank and count:
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                upper = self.buckets[i] if i < len(self.buckets) else self.buckets[-1]
+                return lower + (upper - lower) * (rank - seen) / count
+            seen += count
+        return self.buckets[-1]
+
+
+class MetricsRegistry:
+    """Thread-safe, process-wide counters and histograms keyed by name and labels"""
+
+    def __init__(self):
+        self._counters = {}
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def increment(self, name, amount=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def observe(self, name, value, buckets=LATENCY_BUCKETS, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(buckets)
+            histogram.observe(value)
+
+    def counters(self):
+        """Return [(name, labels dict, value)] sorted by name and labels"""
+        with self._lock:
+            return [(name, dict(labels), value) for (name, labels), value in sorted(self._counters.items())]
+
+    def histograms(self):
+        """Return [(name, labels dict, summary dict)] with count, sum, mean, p50, p95 and p99"""
+        with self._lock:
+            return [
+                (name, dict(labels), {
+                    'count': h.count,
+                    'sum': h.total,
+                    'mean': h.total / h.count if h.count else None,
+                    'p50': h.quantile(0.5),
+                    'p95': h.quantile(0.95),
+                    'p99': h.quantile(0.99),
+                })
+                for (name, labels), h in sorted(self._histograms.items())
+            ]
+
+    def render_prometheus(self):
+        """Return every metric in the Prometheus text exposition format"""
+        lines = []
+        described = set()
+
+        def describe(name):
+            if name not in described:
+                described.add(name)
+                kind, text = _HELP.get(name, ('untyped', name))
+                lines.append(f"# HELP {name} {text}")
+                lines.append(f"# TYPE {name} {kind}")
+
+        with self._lock:
+            for (name, labels), value in sorted(self._counters.items()):
+                describe(name)
+                lines.append(f"{name}{_format_labels(labels)} {value}")
+            for (name, labels), h in sorted(self._histograms.items()):
+                describe(name)
+                cumulative = 0
+                for bound, count in zip(list(h.buckets) + ['+Inf'], h.counts):
+                    cumulative += count
+                    lines.append(f"{name}_bucket{_format_labels(labels + (('le', str(bound)),))} {cumulative}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {h.total}")
+                lines.append(f"{name}_count{_format_labels(labels)} {h.count}")
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels) + "}"
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+# Shared by the API layer and every page
+registry = MetricsRegistry()
+
+
+def increment(name, amount=1, **labels):
+    """Add amount to a counter"""
+    registry.increment(name, amount, **labels)
+
+
+def observe(name, value, buckets=LATENCY_BUCKETS, **labels):
+    """Record one value in a histogram"""
+    registry.observe(name, value, buckets, **labels)
+
+
+@contextmanager
+def timer(name, **labels):
+    """Record the duration of the with-block, in seconds, in histogram name"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        registry.observe(name, time.perf_counter() - started, LATENCY_BUCKETS, **labels)
+
+
+def timed(name, **labels):
+    """Decorator form of timer()"""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with timer(name, **labels):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+
+LUNAR_DISTANCE_KM = 384400.0
+
+# Flattened NEO columns and their dtypes
+NEO_COLUMNS = {
+    'id': 'string',
+    'name': 'string',
+    'hazardous': 'bool',
+    'diameter_min_km': 'float32',
+    'diameter_max_km': 'float32',
+    'velocity_kph': 'float32',
+    'miss_distance_km': 'float64',
+    'miss_distance_ld': 'float32',
+    'approach_time': 'datetime64[ns]',
+    'approach_label': 'string',
+}
+
+
+def normalize_neos(objects):
+    """Flatten NeoWs feed objects into a typed DataFrame with one row per object.
+
+    Each nested lookup and string-to-float conversion happens exactly once
+    here; everything downstream works on numeric columns.
+    """
+    ids, names, hazardous = [], [], []
+    diameter_min, diameter_max = [], []
+    velocity, miss_distance, epoch_ms, labels = [], [], [], []
+
+    for neo in objects:
+        approach = neo['close_approach_data'][0] if neo.get('close_approach_data') else {}
+        diameter = neo.get('estimated_diameter', {}).get('kilometers', {})
+        ids.append(neo['id'])
+        names.append(neo['name'])
+        hazardous.append(bool(neo.get('is_potentially_hazardous_asteroid')))
+        diameter_min.append(diameter.get('estimated_diameter_min', np.nan))
+        diameter_max.append(diameter.get('estimated_diameter_max', np.nan))
+        velocity.append(approach.get('relative_velocity', {}).get('kilometers_per_hour', np.nan))
+        miss_distance.append(approach.get('miss_distance', {}).get('kilometers', np.nan))
+        epoch_ms.append(approach.get('epoch_date_close_approach', np.nan))
+        labels.append(approach.get('close_approach_date_full') or approach.get('close_approach_date'))
+
+    # The feed sends velocities and distances as strings; convert whole columns
+    miss_distance_km = np.asarray(miss_distance, dtype='float64')
+    df = pd.DataFrame({
+        'id': ids,
+        'name': names,
+        'hazardous': hazardous,
+        'diameter_min_km': np.asarray(diameter_min, dtype='float64'),
+        'diameter_max_km': np.asarray(diameter_max, dtype='float64'),
+        'velocity_kph': np.asarray(velocity, dtype='float64'),
+        'miss_distance_km': miss_distance_km,
+        'miss_distance_ld': miss_distance_km / LUNAR_DISTANCE_KM,
+        'approach_time': pd.to_datetime(np.asarray(epoch_ms, dtype='float64'), unit='ms'),
+        'approach_label': labels,
+    })
+    return df.astype(NEO_COLUMNS)
+
+
+def merge_neo_frames(frames):
+    """Concatenate per-day NEO frames in order, keeping each object's first approach"""
+    if not frames:
+        return normalize_neos([])
+    return pd.concat(frames, ignore_index=True).drop_duplicates('id', keep='first', ignore_index=True)